@@ -0,0 +1,85 @@
+"""
+Benchmark search payload decoding (time + peak memory).
+Run from the project root:
+
+    python -m benchmarks.bench_json_decode [recorded_payload.json ...]
+
+Pass one or more recorded `limit=200` responses from the search API.
+Without arguments a synthetic 200-item payload is generated.
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from utils import json_utils
+
+ROUNDS = 50
+
+
+def synthetic_payload(n: int = 200) -> bytes:
+    items = []
+    for i in range(n):
+        items.append({
+            "table_id": i,
+            "category_id": 3,
+            "vendor_name": f"Hotel Sample {i}",
+            "category": "Hotel",
+            "sub_category": "Resort",
+            "description": "Comfortable stay with pool, family rooms and parking. " * 8,
+            "short_description": "Comfortable stay near the city centre.",
+            "star_rating": "4",
+            "address": f"{i} Trimbak Road, Nashik",
+            "area_name": "Trimbak Road",
+            "zone_name": "West",
+            "phone": "0253000000",
+            "pet_friendly": "N",
+            "parking_available": "Y",
+            "air_conditioned": "Y",
+            "price_from": 2500 + i,
+            "price_unit": "night",
+            "google_location": "https://maps.google.com/?q=20.0059,73.7900",
+            "thumbnail_image": f"uploads/vendors/{i}/thumb.jpg",
+            "gallery_images": [f"uploads/vendors/{i}/{g}.jpg" for g in range(10)],
+            "amenities_gallery": [{"amenity": a, "icon": f"icons/{a}.svg"} for a in ("WiFi", "Pool", "Bonfire")],
+            # Fields returned upstream that we never read
+            "seo_meta": {"title": f"Hotel Sample {i}", "keywords": ["nashik", "hotel"] * 10},
+            "reviews": [{"user": f"u{r}", "text": "Great stay! " * 10, "stars": 5} for r in range(5)],
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-06-01T00:00:00Z",
+        })
+    return json.dumps({"status": True, "data": {"search_data": items, "total": n}}).encode()
+
+
+def measure(label: str, fn, content: bytes):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(content)
+    per_call_ms = (time.perf_counter() - start) / ROUNDS * 1000
+
+    tracemalloc.start()
+    result = fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"  {label:<22} {per_call_ms:8.3f} ms/decode   peak {peak / 1024:9.1f} KiB")
+
+
+def main():
+    paths = sys.argv[1:]
+    payloads = [(p, Path(p).read_bytes()) for p in paths] or [("synthetic-200", synthetic_payload())]
+
+    for name, content in payloads:
+        print(f"{name}: {len(content) / 1024:.1f} KiB")
+        measure("json (stdlib)", json.loads, content)
+        if json_utils.orjson is not None:
+            measure("orjson", json_utils.orjson.loads, content)
+        if json_utils.msgspec is not None:
+            measure("msgspec (generic)", json_utils.msgspec.json.decode, content)
+        measure("decode_search_payload", json_utils.decode_search_payload, content)
+
+
+if __name__ == "__main__":
+    main()
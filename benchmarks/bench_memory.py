@@ -0,0 +1,121 @@
+"""
+Benchmark chat memory backends: write and history-read latency under
+concurrency. Run from the project root:
+
+    python -m benchmarks.bench_memory [concurrency ...]
+
+SQLite runs against a temporary file (with and without group commit).
+Postgres is included when DATABASE_URL is set; it writes real rows to
+chat_messages under throwaway bench-<run id>-* user ids and deletes them
+when done.
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from services.db import acquire
+from services.memory_service import MemoryStore, PostgresMemory, SQLiteMemory
+from utils.settings import get_settings
+
+REQUESTS_PER_WORKER = 50
+USERS = 100
+CONCURRENCY = (1, 16, 64)
+RUN_ID = uuid.uuid4().hex[:8]
+
+
+def percentile(values, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(store: MemoryStore, concurrency: int):
+    users = [f"bench-{RUN_ID}-{concurrency}-{i}" for i in range(USERS)]
+    writes, reads = [], []
+
+    async def worker(n: int):
+        for i in range(REQUESTS_PER_WORKER):
+            user = users[(n * REQUESTS_PER_WORKER + i) % USERS]
+
+            start = time.perf_counter()
+            await store.get_recent_messages(user)
+            reads.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await store.save_messages(user, [("user", f"query {i}"), ("assistant", "answer " * 40)])
+            writes.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(n) for n in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    for label, values in (("write", writes), ("read", reads)):
+        print(
+            f"    {label:<6} p50 {statistics.median(values):7.2f} ms   "
+            f"p95 {percentile(values, 0.95):7.2f} ms   "
+            f"p99 {percentile(values, 0.99):7.2f} ms"
+        )
+    print(f"    {len(writes) / elapsed:8.0f} requests/s")
+
+
+async def delete_postgres_rows():
+    async with acquire() as conn:
+        result = await conn.execute(
+            "DELETE FROM chat_messages WHERE app_user_id LIKE $1",
+            f"bench-{RUN_ID}-%",
+        )
+    print(f"  cleanup: {result}")
+
+
+async def bench(label: str, store: MemoryStore, levels, cleanup=None):
+    print(label)
+    await store.start()
+    try:
+        for concurrency in levels:
+            print(f"  concurrency {concurrency}")
+            await run(store, concurrency)
+    finally:
+        try:
+            if cleanup is not None:
+                await cleanup()
+        finally:
+            await store.close()
+
+
+async def main():
+    levels = [int(arg) for arg in sys.argv[1:]] or CONCURRENCY
+    settings = get_settings()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await bench(
+            f"sqlite (group commit, window {settings.memory_group_commit_ms:g} ms)",
+            SQLiteMemory(
+                Path(tmp) / "grouped.db",
+                readers=settings.memory_sqlite_readers,
+                commit_window=settings.memory_group_commit_ms / 1000.0,
+                commit_max=settings.memory_group_commit_max,
+            ),
+            levels,
+        )
+        await bench(
+            "sqlite (one commit per request)",
+            SQLiteMemory(
+                Path(tmp) / "single.db",
+                readers=settings.memory_sqlite_readers,
+                commit_window=0,
+                commit_max=1,
+            ),
+            levels,
+        )
+
+    if settings.database_url:
+        await bench("postgres", PostgresMemory(), levels, cleanup=delete_postgres_rows)
+    else:
+        print("postgres: skipped (DATABASE_URL not set)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark cold start: importing the app and running its startup.
+Run from the project root:
+
+    python -m benchmarks.bench_startup [rounds]
+
+Each round runs in a fresh interpreter so nothing is cached in-process.
+Also prints the slowest imports reported by `python -X importtime`.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+ROUNDS = 10
+TOP_IMPORTS = 15
+
+IMPORT_APP = "import main"
+START_APP = """
+import asyncio, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def run():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(run())
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def measure_import(rounds: int):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run_python("-c", IMPORT_APP)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    baseline = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run_python("-c", "pass")
+        baseline.append((time.perf_counter() - start) * 1000)
+
+    print(f"  interpreter only      {statistics.median(baseline):8.1f} ms")
+    print(f"  import main           {statistics.median(timings):8.1f} ms")
+
+
+def measure_startup(rounds: int):
+    imports, startups = [], []
+    for _ in range(rounds):
+        # The last line is ours; startup logging goes before it
+        imported, started = run_python("-c", START_APP).stdout.strip().splitlines()[-1].split()
+        imports.append(float(imported) * 1000)
+        startups.append(float(started) * 1000)
+
+    print(f"  import (in-process)   {statistics.median(imports):8.1f} ms")
+    print(f"  lifespan startup      {statistics.median(startups):8.1f} ms")
+
+
+def top_imports():
+    # importtime lines: "import time: self [us] | cumulative | imported package"
+    stderr = run_python("-X", "importtime", "-c", IMPORT_APP).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is two spaces per level; keep what main imports directly
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth != 1:
+            continue
+        rows.append((int(cumulative), name.strip()))
+
+    for cumulative, name in sorted(rows, reverse=True)[:TOP_IMPORTS]:
+        print(f"  {name:<40} {cumulative / 1000:8.1f} ms")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS
+
+    print(f"Median of {rounds} fresh interpreters:")
+    measure_import(rounds)
+    measure_startup(rounds)
+
+    print(f"Slowest direct imports of main (cumulative, top {TOP_IMPORTS}):")
+    top_imports()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,128 @@
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-
-from fastapi import FastAPI, HTTPException, Header
+import asyncio
+import hmac
+import random
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, List
+
+from fastapi import FastAPI, HTTPException, Header, Query, Request
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
-from services.intent_service import extract_intent, detect_attribute
-from services.rag_service import get_rag_context, get_rag_items
-from services.llm_service import answer_with_ai
-from services.memory_service import get_recent_messages, save_message
+from services.intent_service import extract_intent, detect_attribute, detect_follow_up
+from services.rag_service import format_context, get_rag_results
+from services.llm_service import answer_with_ai, init_llm_client, template_answer
+from services.memory_service import (
+    close_memory,
+    get_recent_messages,
+    init_memory,
+    save_message,
+    save_messages,
+)
 from services.data_service import resolve_entity, format_attribute_answer, normalize_name
-
-from jose import jwt, JWTError
+from services.catalogue_service import load_snapshot, lookup_entity, start_catalogue_refresh
+from services.cluster_service import start_cluster_sync
+from services.db import get_pool_stats
+from services.admission_service import Overloaded, RateLimited, admission, admit
+from services.image_service import ImageError, cached_etag, get_variant, shutdown_image_workers
+from services.session_service import cursors, serve_follow_up
+from services import popular_service
+
+from utils import deadline
+from utils.compression import CompressionMiddleware
+from utils.image_utils import build_card_image_url
+from utils.profiler import ProfilingMiddleware
+from utils.settings import get_settings
 
 # ------------------------
-# Load environment variables
+# Configuration (.env is loaded once, before any service reads it)
 # ------------------------
-project_root = Path(__file__).resolve().parent
-dotenv_path = project_root / ".env"
-load_dotenv(dotenv_path)
+settings = get_settings()
 
 # ------------------------
 # FastAPI App Setup
 # ------------------------
-app = FastAPI(title="ANVI AI Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm start from the on-disk catalogue snapshot, then keep it fresh.
+    # With several workers only the elected leader refreshes; the others
+    # reload the snapshot when it publishes an invalidation.
+    load_snapshot()
+    init_llm_client()
+    await init_memory()
+    tasks = []
+
+    def on_leader():
+        refresh_task = start_catalogue_refresh()
+        if refresh_task:
+            tasks.append(refresh_task)
+
+    sync_task = start_cluster_sync(on_leader)
+    if sync_task:
+        tasks.append(sync_task)
+
+    warm_task = popular_service.start_popular_warmer()
+    if warm_task:
+        tasks.append(warm_task)
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await close_memory()
+    shutdown_image_workers()
+
+
+app = FastAPI(
+    title="ANVI AI Backend",
+    lifespan=lifespan,
+)
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
+@app.get("/health/db")
+def health_db():
+    return get_pool_stats()
+
+@app.get("/health/admission")
+def health_admission():
+    return admission.stats()
+
+@app.get("/health/popular")
+def health_popular():
+    return popular_service.get_popular_stats()
+
 @app.get("/")
 def root():
     return {"status": "ok"}
 
+# ------------------------
+# On-demand profiling
+# ------------------------
+# Opt-in only: the middleware isn't installed unless an admin token or a
+# sampling rate is configured; unprofiled requests then only pay for
+# profile_trigger.
+def profile_trigger(scope) -> str | None:
+    """
+    "admin" for a request carrying the admin token, "sampled" for one picked
+    by PROFILE_SAMPLE_RATE, else None.
+    """
+    if not scope["path"].startswith(settings.profile_path_prefix):
+        return None
+    if settings.profile_admin_token:
+        header = dict(scope.get("headers") or []).get(b"x-profile")
+        if header and hmac.compare_digest(header, settings.profile_admin_token.encode()):
+            return "admin"
+    if settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate:
+        return "sampled"
+    return None
+
+
+if settings.profile_admin_token or settings.profile_sample_rate > 0:
+    app.add_middleware(ProfilingMiddleware, trigger=profile_trigger)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -42,6 +131,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost: brotli/gzip for JSON responses above the size threshold
+if settings.compression_min_bytes >= 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_bytes,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
 # ------------------------
 # Request Model
 # ------------------------
@@ -49,101 +147,236 @@ class AskRequest(BaseModel):
     query: str
     session_id: str | None = None
 
-# ------------------------
-# MAIN ENDPOINT
-# ------------------------
-@app.post("/ask")
-async def ask_ai(
-    req: AskRequest,
-    authorization: str = Header(None),
-):
-    try:
-        # ------------------------
-        # AUTH (JWT)
-        # ------------------------
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Unauthorized")
 
-        token = authorization.split(" ", 1)[1].strip()
-        if not token:
-            raise HTTPException(status_code=401, detail="Unauthorized")
+class AskBatchRequest(BaseModel):
+    requests: List[AskRequest]
 
-        JWT_SECRET = os.getenv("JWT_SECRET")
-        JWT_ALGORITHM = "HS256"
 
-        if not JWT_SECRET:
-            raise HTTPException(status_code=500, detail="JWT_SECRET not configured")
+# Responses omit unset fields (response_model_exclude_unset), so a `fields`
+# projection only sends the card fields that were asked for
+class Card(BaseModel):
+    title: str | None = None
+    subtitle: str | None = None
+    rating: Any = None
+    address: str | None = None
+    description: str | None = None
+    image: str | None = None
 
-        try:
-            payload = jwt.decode(
-                token,
-                JWT_SECRET,
-                algorithms=[JWT_ALGORITHM],
-                options={
-                    "require": ["exp", "user_id"],
-                    "verify_exp": True,
-                    "verify_signature": True,
-                },
-            )
-            app_user_id = str(payload["user_id"])
-        except JWTError:
-            raise HTTPException(status_code=401, detail="Invalid token")
 
-        # ------------------------
-        # REQUEST DATA
-        # ------------------------
-        query = req.query.strip()
-        session_id = (req.session_id or "").strip()
+class AskResponse(BaseModel):
+    answer: str | None
+    cards: List[Card] = []
+    error: str | None = None  # failed /ask/batch items only
 
-        if not query:
-            raise HTTPException(status_code=400, detail="Query is required")
 
-        print(f"[DEBUG] /ask → {query} | session: {session_id}")
+class AskBatchResponse(BaseModel):
+    results: List[AskResponse]
 
-        # ------------------------
-        # STORE USER MESSAGE
-        # ------------------------
-        await save_message(app_user_id, "user", query)
-        print("[DEBUG] Stored user message in PostgreSQL memory")
 
-        # ------------------------
-        # CONVERSATIONAL SHORT-CIRCUIT
-        # ------------------------
-        q_lower = query.lower()
+CONVERSATIONAL_KEYWORDS = {
+    "hi", "hello", "hey",
+    "good morning", "good evening", "good afternoon",
+    "what can you help me with", "what can you do",
+    "how can you help me", "what do you do"
+}
 
-        CONVERSATIONAL_KEYWORDS = {
-            "hi", "hello", "hey",
-            "good morning", "good evening", "good afternoon",
-            "what can you help me with", "what can you do",
-            "how can you help me", "what do you do"
-        }
+DOMAIN_KEYWORDS = {
+    "hotel", "hotels", "stay", "resort", "villa",
+    "price", "budget", "luxury", "rating", "address",
+    "amenities", "location", "near", "in"
+}
 
-        DOMAIN_KEYWORDS = {
-            "hotel", "hotels", "stay", "resort", "villa",
-            "price", "budget", "luxury", "rating", "address",
-            "amenities", "location", "near", "in"
-        }
+GREETING_ANSWER = (
+    "Hey! 👋 I'm Anvi, I can help you with hotel searches, place details, "
+    "and travel-related questions based on our available data.\n\n"
+    "Just tell me what you're looking for 🙂"
+)
+
+NO_MORE_RESULTS_ANSWER = (
+    "That's all I have for this search. "
+    "Try another area or different filters?"
+)
+
+
+# ------------------------
+# AUTH (JWT)
+# ------------------------
+def verify_token(authorization: str | None) -> tuple[str, str]:
+    """
+    Validate the Bearer JWT and return (token, app_user_id).
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    token = authorization.split(" ", 1)[1].strip()
+    if not token:
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
-        is_conversational = (
-            any(k in q_lower for k in CONVERSATIONAL_KEYWORDS)
-            and not any(d in q_lower for d in DOMAIN_KEYWORDS)
-            and len(q_lower.split()) <= 8
+    JWT_ALGORITHM = "HS256"
+
+    if not settings.jwt_secret:
+        raise HTTPException(status_code=500, detail="JWT_SECRET not configured")
+
+    # Imported on first use; python-jose pulls in its crypto backends
+    from jose import jwt, JWTError
+
+    try:
+        payload = jwt.decode(
+            token,
+            settings.jwt_secret,
+            algorithms=[JWT_ALGORITHM],
+            options={
+                "require": ["exp", "user_id"],
+                "verify_exp": True,
+                "verify_signature": True,
+            },
+        )
+        app_user_id = str(payload["user_id"])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    return token, app_user_id
+
+
+def is_conversational(query: str) -> bool:
+    q_lower = query.lower()
+    return (
+        any(k in q_lower for k in CONVERSATIONAL_KEYWORDS)
+        and not any(d in q_lower for d in DOMAIN_KEYWORDS)
+        and len(q_lower.split()) <= 8
+    )
+
+
+def is_cheap_query(query: str) -> bool:
+    """
+    Greetings and attribute lookups answered from the local catalogue
+    don't need the LLM or the search API; only they get admission priority.
+    """
+    if is_conversational(query):
+        return True
+    intent = extract_intent(query)
+    return (
+        intent.get("type") == "entity_lookup"
+        and detect_attribute(query) is not None
+        and lookup_entity(intent.get("entity_name", "")) is not None
+    )
+
+
+def admission_error(e: Exception) -> HTTPException:
+    if isinstance(e, RateLimited):
+        return HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(int(e.retry_after))},
         )
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, please retry",
+        headers={"Retry-After": "1"},
+    )
 
-        if is_conversational:
-            greeting_answer = (
-                "Hey! 👋 I'm Anvi, I can help you with hotel searches, place details, "
-                "and travel-related questions based on our available data.\n\n"
-                "Just tell me what you're looking for 🙂"
-            )
 
-            await save_message(app_user_id, "assistant", greeting_answer)
+async def load_memory(app_user_id: str) -> str:
+    history = await get_recent_messages(app_user_id)
+    return "\n".join([f"{m['role']}: {m['content']}" for m in history])
+
+
+# ------------------------
+# QUERY PIPELINE
+# ------------------------
+CARD_FIELDS = ("title", "subtitle", "rating", "address", "description", "image")
+
+
+def truncate_text(text: str | None, limit: int) -> str | None:
+    """
+    Cut text to at most `limit` characters at a word boundary.
+    """
+    if not text or limit <= 0 or len(text) <= limit:
+        return text
+    cut = text[:limit - 1].rsplit(" ", 1)[0].rstrip(" ,.;:-")
+    return cut + "…"
+
+
+def build_cards(items: list) -> list:
+    cards = []
+    for item in items[:8]:
+        cards.append({
+            "title": item.get("vendor_name"),
+            "subtitle": item.get("area_name"),
+            "rating": item.get("star_rating"),
+            "address": item.get("address"),
+            "description": truncate_text(item.get("description"), settings.card_description_max_chars),
+            "image": build_card_image_url(item.get("image_url"))
+        })
+    return cards
+
+
+def parse_fields(fields: str | None) -> tuple | None:
+    """
+    Parse the `fields` query parameter (e.g. "title,rating,image").
+    None means every card field.
+    """
+    if not fields:
+        return None
+    selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in CARD_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}; allowed: {', '.join(CARD_FIELDS)}",
+        )
+    return selected
+
+
+def project(result: dict, fields: tuple | None) -> AskResponse:
+    fields = fields or CARD_FIELDS
+    return AskResponse(
+        answer=result["answer"],
+        cards=[Card(**{f: card.get(f) for f in fields}) for card in result["cards"]],
+    )
+
+
+async def answer_query(
+    query: str,
+    session_id: str,
+    app_user_id: str,
+    token: str,
+    get_memory,
+    llm_limit: asyncio.Semaphore | None = None,
+) -> dict:
+    """
+    Answer a single query and return {"answer", "cards"}.
+    Message persistence is left to the caller; `get_memory` is awaited
+    only when the LLM is actually needed.
+    """
+    # ------------------------
+    # CONVERSATIONAL SHORT-CIRCUIT
+    # ------------------------
+    if is_conversational(query):
+        return {
+            "answer": GREETING_ANSWER,
+            "cards": []
+        }
 
+    # ------------------------
+    # SESSION FOLLOW-UPS ("show more", "any cheaper ones?")
+    # Served from the session's last ranked results, no new search
+    # ------------------------
+    follow_up = detect_follow_up(query)
+    served = serve_follow_up(app_user_id, session_id, follow_up) if follow_up else None
+
+    if served:
+        cursor, items = served
+        print(f"[DEBUG] Follow-up '{follow_up}' served from session cursor ({len(items)} items)")
+        if not items:
             return {
-                "answer": greeting_answer,
+                "answer": NO_MORE_RESULTS_ANSWER,
                 "cards": []
             }
-
+        intent = cursor.intent
+        context = await format_context(items, session_id)
+        cards = build_cards(items)
+    else:
         # ------------------------
         # INTENT
         # ------------------------
@@ -158,62 +391,287 @@ async def ask_ai(
 
             if detected_attribute:
                 entity_name = intent.get("entity_name", "")
-                entity_data = await resolve_entity(entity_name, intent, token=token)
+                entity_data = lookup_entity(entity_name)
+                if entity_data is None:
+                    try:
+                        entity_data = await asyncio.wait_for(
+                            resolve_entity(entity_name, intent, token=token),
+                            timeout=deadline.timeout(),
+                        )
+                    except asyncio.TimeoutError:
+                        # Treated as not found: the search below is bounded too
+                        print("[DEBUG] Deadline hit during entity lookup")
 
                 if entity_data:
                     value = entity_data.get(detected_attribute)
                     answer = format_attribute_answer(entity_data, detected_attribute, value)
 
-                    await save_message(app_user_id, "assistant", answer)
-
                     return {
                         "answer": answer,
                         "cards": []
                     }
 
         # ------------------------
-        # RAG CONTEXT
+        # RAG CONTEXT + CARDS (precomputed for popular intents,
+        # otherwise one search within the deadline)
         # ------------------------
-        context = await get_rag_context(category_keyword, session_id, intent)
+        popular_service.record(query, intent)
+        warm = popular_service.lookup(intent)
+
+        warm_answer = None
+
+        if warm:
+            print("[DEBUG] Popular intent: using precomputed results")
+            context, items = warm.context, warm.items
+            warm_answer = popular_service.warm_answer(warm, query)
+        else:
+            try:
+                context, items = await asyncio.wait_for(
+                    get_rag_results(category_keyword, session_id, intent),
+                    timeout=deadline.timeout(),
+                )
+            except asyncio.TimeoutError:
+                print("[DEBUG] Deadline hit during search")
+                context, items = "", []
+
+        cards = build_cards(items)
+        cursors.save(app_user_id, session_id, category_keyword, intent, items, shown=len(cards))
+
+        if warm_answer:
+            return {
+                "answer": warm_answer,
+                "cards": cards
+            }
 
-        history = await get_recent_messages(app_user_id)
-        memory = "\n".join([f"{m['role']}: {m['content']}" for m in history])
+    # ------------------------
+    # LLM (skipped when the remaining budget can't fit it)
+    # ------------------------
+    if deadline.remaining() < settings.llm_min_budget_seconds:
+        print("[DEBUG] Deadline too close for LLM, using template answer")
+        return {
+            "answer": template_answer(items),
+            "cards": cards
+        }
 
-        # ------------------------
-        # LLM
-        # ------------------------
-        answer = await answer_with_ai(
-            query=query,
-            context=context or "",
-            intent=intent,
-            memory=memory
-        )
+    try:
+        memory = await get_memory()
+    except Exception as e:
+        print("[ERROR] Memory load failed, continuing without history:", e)
+        memory = ""
+
+    async def run_llm():
+        async with (llm_limit or nullcontext()):
+            return await answer_with_ai(
+                query=query,
+                context=context or "",
+                intent=intent,
+                memory=memory
+            )
+
+    try:
+        answer = await asyncio.wait_for(run_llm(), timeout=deadline.timeout())
+    except asyncio.TimeoutError:
+        answer = None
+    if answer is None:
+        print("[DEBUG] Deadline hit during LLM call, using template answer")
+        answer = template_answer(items)
+
+    return {
+        "answer": answer,
+        "cards": cards
+    }
+
+
+# ------------------------
+# MAIN ENDPOINT
+# ------------------------
+@app.post("/ask", response_model=AskResponse, response_model_exclude_unset=True)
+async def ask_ai(
+    req: AskRequest,
+    authorization: str = Header(None),
+    fields: str | None = Query(None, description="Comma-separated card fields to return"),
+):
+    deadline.start(settings.ask_deadline_seconds)
+
+    try:
+        token, app_user_id = verify_token(authorization)
+        selected_fields = parse_fields(fields)
 
         # ------------------------
-        # CARDS
+        # REQUEST DATA
         # ------------------------
-        items = await get_rag_items(category_keyword, intent)
+        query = req.query.strip()
+        session_id = (req.session_id or "").strip()
+
+        if not query:
+            raise HTTPException(status_code=400, detail="Query is required")
 
-        cards = []
-        for item in items[:8]:
-            cards.append({
-                "title": item.get("vendor_name"),
-                "subtitle": item.get("area_name"),
-                "rating": item.get("star_rating"),
-                "address": item.get("address"),
-                "description": item.get("description"),
-                "image": item.get("image_url")
-            })
+        print(f"[DEBUG] /ask → {query} | session: {session_id}")
 
-        await save_message(app_user_id, "assistant", answer)
+        async with admit(app_user_id, priority=is_cheap_query(query)):
+            # ------------------------
+            # STORE USER MESSAGE
+            # ------------------------
+            await save_message(app_user_id, "user", query)
+            print("[DEBUG] Stored user message in memory")
+
+            result = await answer_query(
+                query,
+                session_id,
+                app_user_id,
+                token,
+                get_memory=lambda: load_memory(app_user_id),
+            )
 
-        return {
-            "answer": answer,
-            "cards": cards
-        }
+            await save_message(app_user_id, "assistant", result["answer"])
+
+        return project(result, selected_fields)
 
     except HTTPException:
         raise
+    except (RateLimited, Overloaded) as e:
+        raise admission_error(e)
     except Exception as e:
         print("[ERROR]", e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+# ------------------------
+# BATCH ENDPOINT
+# ------------------------
+@app.post("/ask/batch", response_model=AskBatchResponse, response_model_exclude_unset=True)
+async def ask_ai_batch(
+    req: AskBatchRequest,
+    authorization: str = Header(None),
+    fields: str | None = Query(None, description="Comma-separated card fields to return"),
+):
+    """
+    Answer several queries in one call.
+    The JWT is verified once, identical queries are answered once, LLM calls
+    run concurrently (bounded by ASK_BATCH_LLM_CONCURRENCY) and all messages are
+    persisted in a single write. Results keep the request order.
+    """
+    deadline.start(settings.ask_deadline_seconds)
+
+    try:
+        token, app_user_id = verify_token(authorization)
+        selected_fields = parse_fields(fields)
+
+        if not req.requests:
+            raise HTTPException(status_code=400, detail="At least one request is required")
+        if len(req.requests) > settings.ask_batch_max_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch size exceeds limit of {settings.ask_batch_max_size}",
+            )
+
+        queries = [(r.query.strip(), (r.session_id or "").strip()) for r in req.requests]
+        if any(not q for q, _ in queries):
+            raise HTTPException(status_code=400, detail="Query is required")
+
+        print(f"[DEBUG] /ask/batch → {len(queries)} queries")
+
+        # Dedupe identical queries (case/whitespace-insensitive) within a
+        # session: each answer also saves or advances that session's cursor
+        keys = [f"{session_id}|{' '.join(query.lower().split())}" for query, session_id in queries]
+
+        # One admission slot per distinct query: they all run at once
+        priority = all(is_cheap_query(q) for q, _ in queries)
+        async with admit(app_user_id, priority=priority, cost=len(queries), slots=len(set(keys))):
+            # History is read once (before this batch is written) and shared
+            memory_task = None
+
+            def get_memory():
+                nonlocal memory_task
+                if memory_task is None:
+                    memory_task = asyncio.ensure_future(load_memory(app_user_id))
+                return memory_task
+
+            llm_limit = asyncio.Semaphore(settings.ask_batch_llm_concurrency)
+
+            unique: dict[str, asyncio.Task] = {}
+            for (query, session_id), key in zip(queries, keys):
+                if key not in unique:
+                    unique[key] = asyncio.ensure_future(
+                        answer_query(query, session_id, app_user_id, token, get_memory, llm_limit)
+                    )
+
+            outcomes = await asyncio.gather(*unique.values(), return_exceptions=True)
+            by_key = dict(zip(unique.keys(), outcomes))
+
+            results = []
+            messages = []
+            for (query, _), key in zip(queries, keys):
+                outcome = by_key[key]
+                if isinstance(outcome, BaseException):
+                    print("[ERROR] /ask/batch item:", outcome)
+                    results.append(AskResponse(answer=None, cards=[], error="Internal Server Error"))
+                    continue
+
+                results.append(project(outcome, selected_fields))
+                messages.append(("user", query))
+                messages.append(("assistant", outcome["answer"]))
+
+            await save_messages(app_user_id, messages)
+
+        return AskBatchResponse(results=results)
+
+    except HTTPException:
+        raise
+    except (RateLimited, Overloaded) as e:
+        raise admission_error(e)
+    except Exception as e:
+        print("[ERROR]", e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+# ------------------------
+# THUMBNAIL PROXY
+# ------------------------
+# Not immutable: /img URLs name the source, not its content
+IMAGE_CACHE_CONTROL = f"public, max-age={settings.image_max_age_seconds}"
+
+
+def etag_matches(request: Request, etag: str | None) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+@app.get("/img")
+async def card_image(
+    request: Request,
+    src: str = Query(...),
+    w: int = Query(320),
+    fmt: str = Query("webp"),
+):
+    """
+    Serve a card-sized WebP/JPEG variant of a CDN image.
+    Variants are built once and kept in a size-bounded on-disk LRU cache.
+    """
+    # Revalidations of a fresh cached variant are answered without a lookup
+    etag = cached_etag(src, w, fmt)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL})
+
+    try:
+        path, etag, media_type = await get_variant(src, w, fmt)
+    except ImageError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+# ------------------------
+# Multi-worker entrypoint
+# ------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    # Workers share the catalogue snapshot, cache invalidations and the
+    # DB connection budget; set WEB_CONCURRENCY to choose the worker count.
+    uvicorn.run("main:app", host="0.0.0.0", port=settings.port, workers=settings.worker_count)
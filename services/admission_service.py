@@ -0,0 +1,194 @@
+# services/admission_service.py
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from utils.settings import get_settings
+
+settings = get_settings()
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# ------------------------
+# Rate limiting
+# ------------------------
+class RateLimiter:
+    """
+    Token bucket per key (JWT user_id). Buckets for idle users are evicted
+    LRU-first once more than `max_keys` are tracked.
+    """
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def check(self, key: str, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens for `key`.
+        Returns 0 if allowed, otherwise seconds until enough tokens refill.
+        """
+        if self.rate <= 0:
+            return 0.0
+        cost = min(cost, self.burst)  # a single call can always succeed eventually
+
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return 0.0
+
+        bucket[0] = tokens
+        return (cost - tokens) / self.rate
+
+
+# ------------------------
+# Admission control
+# ------------------------
+class AdmissionController:
+    """
+    Caps in-flight requests. Low-priority (LLM-bound) requests may only use
+    max_in_flight - reserved slots; priority requests may use all of them
+    and are woken first. Waiters beyond max_queue, or waiting longer than
+    timeout, are rejected instead of piling up.
+    A request doing several units of work at once (a batch) takes several
+    slots together, capped at what its priority class may use.
+    """
+
+    def __init__(self, max_in_flight: int, reserved: int, max_queue: int, timeout: float):
+        self.max_in_flight = max_in_flight
+        self.low_limit = max(1, max_in_flight - reserved)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiters = {True: deque(), False: deque()}
+        self.rejected = 0
+
+    def _limit(self, priority: bool) -> int:
+        return self.max_in_flight if priority else self.low_limit
+
+    def _can_admit(self, priority: bool, slots: int) -> bool:
+        if self.in_flight + slots > self._limit(priority):
+            return False
+        return priority or not self.waiters[True]
+
+    async def acquire(self, priority: bool, slots: int = 1) -> int:
+        """
+        Take `slots` slots (capped so the request can always be admitted);
+        returns how many were taken, to pass back to release().
+        """
+        slots = max(1, min(slots, self._limit(priority)))
+        if not self.waiters[priority] and self._can_admit(priority, slots):
+            self.in_flight += slots
+            return slots
+
+        if len(self.waiters[True]) + len(self.waiters[False]) >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, slots)
+        self.waiters[priority].append(entry)
+        try:
+            # On success the slots were handed over by release()
+            await asyncio.wait_for(waiter, self.timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slots were handed over just as we gave up; pass them on
+                self.release(slots)
+            else:
+                try:
+                    self.waiters[priority].remove(entry)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise Overloaded("queue timeout")
+            raise
+        return slots
+
+    def release(self, slots: int = 1):
+        self.in_flight -= slots
+        self._wake()
+
+    def _wake(self):
+        # Priority waiters first, then low-priority ones within their limit;
+        # FIFO, so a multi-slot waiter at the head isn't starved
+        for priority, limit in ((True, self.max_in_flight), (False, self.low_limit)):
+            queue = self.waiters[priority]
+            while queue:
+                waiter, slots = queue[0]
+                if waiter.done():
+                    queue.popleft()
+                    continue
+                if self.in_flight + slots > limit:
+                    break
+                queue.popleft()
+                self.in_flight += slots
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: bool = False, slots: int = 1):
+        taken = await self.acquire(priority, slots)
+        try:
+            yield
+        finally:
+            self.release(taken)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued_priority": len(self.waiters[True]),
+            "queued": len(self.waiters[False]),
+            "rejected": self.rejected,
+        }
+
+
+rate_limiter = RateLimiter(settings.rate_limit_per_minute, settings.rate_limit_burst, settings.rate_limit_max_users)
+admission = AdmissionController(
+    settings.admission_max_in_flight,
+    settings.admission_reserved_priority_slots,
+    settings.admission_max_queue,
+    settings.admission_queue_timeout_seconds,
+)
+
+
+@asynccontextmanager
+async def admit(user_id: str, priority: bool = False, cost: float = 1.0, slots: int = 1):
+    """
+    Rate-limit `user_id`, then hold `slots` global in-flight slots for the
+    block. Raises RateLimited or Overloaded instead of queueing unbounded work.
+    """
+    retry_after = rate_limiter.check(user_id, cost)
+    if retry_after:
+        raise RateLimited(math.ceil(retry_after))
+
+    async with admission.slot(priority, slots):
+        yield
@@ -0,0 +1,302 @@
+# services/catalogue_service.py
+
+import asyncio
+import hashlib
+import mmap
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from services.cluster_service import publish_invalidation, register_invalidation
+from services.data_service import (
+    BASE_URL,
+    normalize_hotel_entity,
+    normalize_name,
+)
+from utils.image_utils import build_image_url, pick_image_path
+from utils.json_utils import SearchItem, decode_search_payload, dumps, loads
+from utils.settings import get_settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+settings = get_settings()
+
+SNAPSHOT_FORMAT = 1
+
+# Fields kept per record: the search schema plus the resolved card image
+RECORD_FIELDS = tuple(SearchItem.__annotations__) + ("image_url",)
+
+
+@dataclass
+class Catalogue:
+    """
+    In-memory catalogue: slim item records plus lookup indexes.
+    `version` increases whenever a refresh changes the item set.
+    """
+    items: List[Dict[str, Any]]
+    hashes: Dict[str, str]
+    version: int = 0
+    built_at: float = 0.0
+    by_key: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    by_name: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for item in self.items:
+            self.by_key[item_key(item)] = item
+
+            for name in (item.get("vendor_name"), item.get("name")):
+                normalized = normalize_name(name or "")
+                if normalized:
+                    self.by_name.setdefault(normalized, item)
+
+
+_catalogue: Catalogue | None = None
+_loaded_mtime: float | None = None
+_refresh_lock = asyncio.Lock()
+
+
+def get_catalogue() -> Catalogue | None:
+    return _catalogue
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """
+    Stable identity for a catalogue item (table_id, else normalized name).
+    """
+    if item.get("table_id") is not None:
+        return str(item["table_id"])
+    return "name:" + normalize_name(item.get("vendor_name") or item.get("name") or "")
+
+
+def _make_record(item: Dict[str, Any]) -> Dict[str, Any]:
+    record = {k: item[k] for k in RECORD_FIELDS if k in item and item[k] is not None}
+    record["image_url"] = build_image_url(pick_image_path(record))
+    return record
+
+
+def _hash_item(item: Dict[str, Any]) -> str:
+    # Key order comes from the upstream payload, which is stable per item
+    return hashlib.blake2b(dumps(item), digest_size=12).hexdigest()
+
+
+# ------------------------
+# Snapshot persistence
+# ------------------------
+def _encode_snapshot(data: Dict[str, Any]) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(data, use_bin_type=True)
+    return dumps(data)
+
+
+def _decode_snapshot(buf) -> Dict[str, Any]:
+    if msgpack is not None:
+        try:
+            return msgpack.unpackb(buf, raw=False, strict_map_key=False)
+        except Exception:
+            pass  # JSON snapshot written without msgpack installed
+    return loads(bytes(buf))
+
+
+def save_snapshot(catalogue: Catalogue, path: Path = settings.catalogue_snapshot_path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(_encode_snapshot({
+        "format": SNAPSHOT_FORMAT,
+        "version": catalogue.version,
+        "built_at": catalogue.built_at,
+        "items": catalogue.items,
+        "hashes": catalogue.hashes,
+    }))
+    # Atomic swap so concurrent readers never see a partial file
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path = settings.catalogue_snapshot_path) -> Catalogue | None:
+    """
+    Load the on-disk snapshot into memory (called at startup).
+    The file is decoded straight from a read-only memory map, skipping the
+    intermediate read buffer; each worker still holds its own decoded items.
+    """
+    global _catalogue, _loaded_mtime
+
+    if not path.exists():
+        print(f"[DEBUG] Catalogue: no snapshot at {path}")
+        return None
+
+    start = time.perf_counter()
+    try:
+        mtime = path.stat().st_mtime
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = _decode_snapshot(mm)
+        if data.get("format") != SNAPSHOT_FORMAT:
+            print("[DEBUG] Catalogue: snapshot format mismatch, ignoring")
+            return None
+        catalogue = Catalogue(
+            items=data["items"],
+            hashes=data["hashes"],
+            version=data["version"],
+            built_at=data["built_at"],
+        )
+    except Exception as e:
+        print("[ERROR] Catalogue snapshot load failed:", e)
+        return None
+
+    _catalogue = catalogue
+    _loaded_mtime = mtime
+    print(
+        f"[DEBUG] Catalogue: loaded {len(catalogue.items)} items "
+        f"(v{catalogue.version}) in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return catalogue
+
+
+def _reload_if_changed():
+    # Invalidation callback: pick up a snapshot written by another worker
+    path = settings.catalogue_snapshot_path
+    if path.exists() and path.stat().st_mtime != _loaded_mtime:
+        load_snapshot(path)
+
+
+register_invalidation(_reload_if_changed)
+
+
+# ------------------------
+# Prefetch / refresh
+# ------------------------
+async def fetch_catalogue(token: str | None = None) -> List[Dict[str, Any]]:
+    """
+    Page through the full search catalogue with page/limit.
+    """
+    effective_token = (token or "").strip() or settings.nashik_api_token
+    headers = {
+        "Authorization": f"Bearer {effective_token}",
+        "Accept": "application/json",
+    }
+
+    items: List[Dict[str, Any]] = []
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        for page in range(1, settings.catalogue_max_pages + 1):
+            params = {"query": settings.catalogue_query, "page": page, "limit": settings.catalogue_page_size}
+            response = await client.get(BASE_URL, params=params, headers=headers)
+            response.raise_for_status()
+            payload = decode_search_payload(response.content)
+
+            page_items = []
+            if (
+                isinstance(payload, dict)
+                and isinstance(payload.get("data"), dict)
+                and isinstance(payload["data"].get("search_data"), list)
+            ):
+                page_items = [i for i in payload["data"]["search_data"] if isinstance(i, dict)]
+
+            items.extend(page_items)
+            if len(page_items) < settings.catalogue_page_size:
+                break
+
+    return items
+
+
+async def refresh_catalogue(token: str | None = None) -> Catalogue | None:
+    """
+    Fetch the catalogue and merge it into the current one.
+    Only new or changed items (by content hash) are rebuilt; if nothing
+    changed the snapshot is left untouched and the version is kept.
+    """
+    global _catalogue, _loaded_mtime
+
+    async with _refresh_lock:
+        try:
+            raw_items = await fetch_catalogue(token)
+        except Exception as e:
+            print("[ERROR] Catalogue refresh failed:", e)
+            return _catalogue
+
+        if not raw_items:
+            print("[DEBUG] Catalogue: refresh returned no items, keeping current")
+            return _catalogue
+
+        previous = _catalogue
+        old_by_key = previous.by_key if previous else {}
+        old_hashes = previous.hashes if previous else {}
+
+        items: List[Dict[str, Any]] = []
+        hashes: Dict[str, str] = {}
+        changed = 0
+        for raw in raw_items:
+            key = item_key(raw)
+            if key in hashes:
+                continue  # duplicate across pages
+
+            digest = _hash_item(raw)
+            hashes[key] = digest
+            if old_hashes.get(key) == digest and key in old_by_key:
+                items.append(old_by_key[key])
+            else:
+                items.append(_make_record(raw))
+                changed += 1
+
+        removed = len(set(old_hashes) - set(hashes))
+        if previous and not changed and not removed:
+            print(f"[DEBUG] Catalogue: unchanged (v{previous.version})")
+            return previous
+
+        catalogue = Catalogue(
+            items=items,
+            hashes=hashes,
+            version=(previous.version + 1) if previous else 1,
+            built_at=time.time(),
+        )
+        save_snapshot(catalogue)
+        _catalogue = catalogue
+        _loaded_mtime = settings.catalogue_snapshot_path.stat().st_mtime
+
+        print(
+            f"[DEBUG] Catalogue: v{catalogue.version} with {len(items)} items "
+            f"({changed} changed, {removed} removed)"
+        )
+        # Followers reload the snapshot; dependent caches are dropped everywhere
+        publish_invalidation()
+        return catalogue
+
+
+async def _refresh_loop():
+    # Refresh right away when starting cold, otherwise wait one interval
+    if _catalogue is not None:
+        await asyncio.sleep(settings.catalogue_refresh_seconds)
+    while True:
+        await refresh_catalogue()
+        await asyncio.sleep(settings.catalogue_refresh_seconds)
+
+
+def start_catalogue_refresh() -> asyncio.Task | None:
+    """
+    Start the background prefetch/refresh job.
+    Disabled when CATALOGUE_REFRESH_SECONDS <= 0.
+    """
+    if settings.catalogue_refresh_seconds <= 0:
+        return None
+    return asyncio.create_task(_refresh_loop())
+
+
+# ------------------------
+# Local lookups
+# ------------------------
+def lookup_entity(entity_name: str) -> Dict[str, Any] | None:
+    """
+    Exact normalized-name lookup against the catalogue.
+    Returns normalized entity data, or None so callers fall back to the API.
+    """
+    if _catalogue is None:
+        return None
+
+    item = _catalogue.by_name.get(normalize_name(entity_name))
+    if item is None:
+        return None
+    return normalize_hotel_entity(item)
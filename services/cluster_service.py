@@ -0,0 +1,148 @@
+# services/cluster_service.py
+
+import asyncio
+import mmap
+import os
+import struct
+from typing import Callable, List
+
+from utils.settings import get_settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run single-worker
+    fcntl = None
+
+settings = get_settings()
+
+# uvicorn reads WEB_CONCURRENCY (settings.worker_count) as its default --workers
+MULTI_WORKER = settings.worker_count > 1 and fcntl is not None
+
+_GENERATION = struct.Struct("<Q")
+
+_leader_fd = None
+_generation_fd = None
+_generation_map: mmap.mmap | None = None
+_seen_generation = 0
+_invalidation_callbacks: List[Callable[[], None]] = []
+
+
+# ------------------------
+# Leader election
+# ------------------------
+def try_become_leader() -> bool:
+    """
+    Exactly one worker holds the leader lock and runs upstream jobs
+    (catalogue refresh). The lock is released by the OS if it dies.
+    """
+    global _leader_fd
+
+    if not MULTI_WORKER or _leader_fd is not None:
+        return True
+
+    settings.cluster_state_dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(settings.cluster_state_dir / "leader.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+
+    _leader_fd = fd
+    print(f"[DEBUG] Cluster: worker {os.getpid()} is leader")
+    return True
+
+
+# ------------------------
+# Cross-process cache invalidation
+# ------------------------
+def _open_generation():
+    global _generation_fd, _generation_map, _seen_generation
+
+    if _generation_map is not None:
+        return
+
+    settings.cluster_state_dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(settings.cluster_state_dir / "cache.generation", os.O_RDWR | os.O_CREAT, 0o644)
+    if os.fstat(fd).st_size < _GENERATION.size:
+        os.ftruncate(fd, _GENERATION.size)
+
+    _generation_fd = fd
+    _generation_map = mmap.mmap(fd, _GENERATION.size)
+    _seen_generation = _GENERATION.unpack_from(_generation_map)[0]
+
+
+def current_generation() -> int:
+    if not MULTI_WORKER:
+        return _seen_generation
+    _open_generation()
+    return _GENERATION.unpack_from(_generation_map)[0]
+
+
+def register_invalidation(callback: Callable[[], None]):
+    """
+    Register a callback that clears/reloads a per-process cache.
+    It runs in every worker whenever any worker publishes an invalidation.
+    """
+    _invalidation_callbacks.append(callback)
+
+
+def _run_callbacks():
+    for callback in _invalidation_callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print("[ERROR] Cache invalidation callback failed:", e)
+
+
+def publish_invalidation():
+    """
+    Invalidate caches in this worker and signal all other workers.
+    """
+    global _seen_generation
+
+    if MULTI_WORKER:
+        _open_generation()
+        fcntl.flock(_generation_fd, fcntl.LOCK_EX)
+        try:
+            generation = _GENERATION.unpack_from(_generation_map)[0] + 1
+            _GENERATION.pack_into(_generation_map, 0, generation)
+        finally:
+            fcntl.flock(_generation_fd, fcntl.LOCK_UN)
+        _seen_generation = generation
+    else:
+        _seen_generation += 1
+
+    _run_callbacks()
+
+
+async def _sync_loop(on_leader: Callable[[], None]):
+    global _seen_generation
+
+    while True:
+        await asyncio.sleep(settings.cluster_sync_seconds)
+
+        generation = current_generation()
+        if generation != _seen_generation:
+            _seen_generation = generation
+            _run_callbacks()
+
+        # Take over upstream jobs if the previous leader went away
+        if _leader_fd is None and try_become_leader():
+            on_leader()
+
+
+def start_cluster_sync(on_leader: Callable[[], None]) -> asyncio.Task | None:
+    """
+    Elect a leader and start watching for invalidations from other workers.
+    `on_leader` is called once this worker becomes leader (immediately in
+    single-worker mode).
+    """
+    if try_become_leader():
+        on_leader()
+
+    if not MULTI_WORKER:
+        return None
+
+    _open_generation()
+    return asyncio.create_task(_sync_loop(on_leader))
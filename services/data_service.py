@@ -1,17 +1,18 @@
 # services/data_service.py
 
-import os
 import random
 from typing import Any, Dict, List
 import httpx
-from dotenv import load_dotenv
 
-from utils.image_utils import build_image_url
+from utils.image_utils import build_image_url, pick_image_path
+from utils import deadline
+from utils.json_utils import decode_search_payload
+from utils.settings import get_settings
 
-load_dotenv()
+settings = get_settings()
 
-API_TOKEN = os.getenv("NASHIK_API_TOKEN", "").strip()
 BASE_URL = "https://nashikguide.sapphiredigital.agency/api/search/"
+SEARCH_TIMEOUT_SECONDS = 15.0
 
 
 def normalize_name(name: str) -> str:
@@ -140,7 +141,7 @@ async def resolve_entity(
     }
 
     # Prefer caller-provided Bearer token; fall back to .env token
-    effective_token = (token or "").strip() or API_TOKEN
+    effective_token = (token or "").strip() or settings.nashik_api_token
 
     headers = {
         "Authorization": f"Bearer {effective_token}",
@@ -148,10 +149,10 @@ async def resolve_entity(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with httpx.AsyncClient(timeout=deadline.timeout(SEARCH_TIMEOUT_SECONDS)) as client:
             response = await client.get(BASE_URL, params=params, headers=headers)
             response.raise_for_status()
-            payload = response.json()
+            payload = decode_search_payload(response.content)
     except Exception as e:
         print("[ERROR] resolve_entity API exception:", e)
         return None
@@ -174,13 +175,7 @@ async def resolve_entity(
         if not isinstance(item, dict):
             continue
 
-        image_path = None
-        if item.get("thumbnail_image"):
-            image_path = item["thumbnail_image"]
-        elif isinstance(item.get("gallery_images"), list) and item["gallery_images"]:
-            image_path = item["gallery_images"][0]
-
-        item["image_url"] = build_image_url(image_path)
+        item["image_url"] = build_image_url(pick_image_path(item))
         items.append(item)
 
     # ----------------------------------------
@@ -358,7 +353,7 @@ async def search_api(
     }
 
     # Prefer caller-provided Bearer token; fall back to .env token
-    effective_token = (token or "").strip() or API_TOKEN
+    effective_token = (token or "").strip() or settings.nashik_api_token
 
     headers = {
         "Authorization": f"Bearer {effective_token}",
@@ -366,10 +361,10 @@ async def search_api(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with httpx.AsyncClient(timeout=deadline.timeout(SEARCH_TIMEOUT_SECONDS)) as client:
             response = await client.get(BASE_URL, params=params, headers=headers)
             response.raise_for_status()
-            payload = response.json()
+            payload = decode_search_payload(response.content)
     except Exception as e:
         print("[ERROR] search_api exception:", e)
         return []
@@ -397,14 +392,7 @@ async def search_api(
         if not isinstance(item, dict):
             continue
 
-        image_path = None
-
-        if item.get("thumbnail_image"):
-            image_path = item["thumbnail_image"]
-        elif isinstance(item.get("gallery_images"), list) and item["gallery_images"]:
-            image_path = item["gallery_images"][0]
-
-        item["image_url"] = build_image_url(image_path)
+        item["image_url"] = build_image_url(pick_image_path(item))
         normalized.append(item)
 
     # -------------------------------
@@ -418,7 +406,7 @@ async def search_api(
     # If nothing matched → randomize
     if not matched:
         random.shuffle(normalized)
-        return normalized[:8]
+        return normalized[:limit]
 
     matched.sort(key=lambda x: x["_score"], reverse=True)
-    return matched[:8]
+    return matched[:limit]
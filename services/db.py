@@ -1,20 +1,161 @@
-import asyncpg
-import os
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+from utils import deadline
+from utils.settings import get_settings
+
+settings = get_settings()
 
 _pool = None
+_pool_lock = asyncio.Lock()
+
+# SQL registered for preparation, and the prepared statements per connection
+_statements: list[str] = []
+_prepared: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+_stats = {
+    "acquires": 0,
+    "timeouts": 0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+}
+
+
+def register_statement(sql: str) -> str:
+    """
+    Register a hot query to be prepared on every new pool connection.
+    Must be called at import time, before the pool is created.
+    """
+    _statements.append(sql)
+    return sql
+
+
+async def _init_connection(conn):
+    if settings.db_statement_cache_size <= 0:
+        return
+    _prepared[conn] = {sql: await conn.prepare(sql) for sql in _statements}
+
+
+async def _create_pool():
+    # Imported here: asyncpg is only needed once a database is configured
+    import asyncpg
+
+    return await asyncpg.create_pool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_inactive_connection_lifetime=settings.db_max_inactive_connection_lifetime,
+        statement_cache_size=settings.db_statement_cache_size,
+        command_timeout=settings.db_command_timeout,
+        init=_init_connection,
+    )
+
 
 async def get_db_pool():
     global _pool
 
-    if not DATABASE_URL:
+    if not settings.database_url:
         raise RuntimeError("DATABASE_URL environment variable is not set")
 
     if _pool is None:
-        _pool = await asyncpg.create_pool(
-            DATABASE_URL,
-            min_size=1,
-            max_size=5,
-        )
+        # Lock so concurrent first requests don't each create a pool
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await _create_pool()
     return _pool
+
+
+async def init_db_pool():
+    """
+    Create the pool at startup so the first request doesn't pay for it.
+    Failures are logged; get_db_pool() retries lazily.
+    """
+    if not settings.database_url:
+        print("[DEBUG] DATABASE_URL not set, skipping DB pool init")
+        return
+
+    try:
+        await get_db_pool()
+        print(f"[DEBUG] DB pool ready (min={settings.db_pool_min_size}, max={settings.db_pool_max_size})")
+    except Exception as e:
+        print("[ERROR] DB pool init failed:", e)
+
+
+async def close_db_pool():
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def acquire():
+    """
+    Acquire a pooled connection, recording how long we waited for it.
+    """
+    pool = await get_db_pool()
+
+    start = time.perf_counter()
+    try:
+        conn = await pool.acquire(
+            timeout=deadline.timeout(settings.db_acquire_timeout, floor=settings.db_deadline_floor)
+        )
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise
+
+    wait_ms = (time.perf_counter() - start) * 1000
+    _stats["acquires"] += 1
+    _stats["wait_ms_total"] += wait_ms
+    _stats["wait_ms_max"] = max(_stats["wait_ms_max"], wait_ms)
+
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def query_timeout() -> float | None:
+    """
+    Per-query timeout: DB_COMMAND_TIMEOUT shortened to the request deadline.
+    """
+    return deadline.timeout(settings.db_command_timeout, floor=settings.db_deadline_floor)
+
+
+async def fetch(conn, sql: str, *args):
+    """
+    Run a registered statement through its prepared form when available,
+    bounded by the request deadline.
+    """
+    # Pool connections are proxies; prepared statements live on the raw one
+    raw = getattr(conn, "_con", conn)
+    stmt = _prepared.get(raw, {}).get(sql)
+    timeout = query_timeout()
+    if stmt is not None:
+        return await stmt.fetch(*args, timeout=timeout)
+    return await conn.fetch(sql, *args, timeout=timeout)
+
+
+def get_pool_stats() -> dict:
+    stats = {
+        "configured": _pool is not None,
+        "min_size": settings.db_pool_min_size,
+        "max_size": settings.db_pool_max_size,
+        "acquires": _stats["acquires"],
+        "acquire_timeouts": _stats["timeouts"],
+        "avg_wait_ms": round(_stats["wait_ms_total"] / _stats["acquires"], 3) if _stats["acquires"] else 0.0,
+        "max_wait_ms": round(_stats["wait_ms_max"], 3),
+    }
+
+    if _pool is not None:
+        size = _pool.get_size()
+        in_use = size - _pool.get_idle_size()
+        stats.update({
+            "size": size,
+            "in_use": in_use,
+            "saturation": round(in_use / settings.db_pool_max_size, 3),
+        })
+    return stats
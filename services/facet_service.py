@@ -0,0 +1,201 @@
+# services/facet_service.py
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from services.catalogue_service import Catalogue, get_catalogue, item_key
+from services.data_service import normalize_hotel_entity, score_item
+from utils.settings import get_settings
+
+settings = get_settings()
+
+# must_have values backed by normalize_hotel_entity flags
+ENTITY_FLAGS = (
+    "pool", "wifi", "bonfire", "parking", "pet_friendly",
+    "air_conditioned", "food_available", "kitchen_available",
+)
+
+# must_have values detected from the item's own text
+TEXT_FLAGS = ("family", "couple")
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"\d+(?:\.\d+)?", value.replace(",", ""))
+        if match:
+            return float(match.group())
+    return None
+
+
+def item_price(item: Dict[str, Any]) -> Optional[float]:
+    return _to_number(item.get("price_from"))
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    # Yields set bit positions, lowest first; O(popcount)
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FacetIndex:
+    """
+    Boolean facets as bitsets (Python ints, bit i = catalogue item i) and
+    price/rating as cumulative bitsets over their distinct sorted values.
+    """
+
+    def __init__(self, catalogue: Catalogue):
+        self.catalogue = catalogue
+        self.items = catalogue.items
+        self.flags: Dict[str, int] = {}
+        self.categories: Dict[str, int] = {}
+        self.positions: Dict[str, int] = {}
+
+        prices: List[Tuple[float, int]] = []
+        ratings: List[Tuple[float, int]] = []
+
+        for pos, item in enumerate(self.items):
+            bit = 1 << pos
+            self.positions[item_key(item)] = pos
+
+            entity = normalize_hotel_entity(item)
+            for flag in ENTITY_FLAGS:
+                if entity.get(flag):
+                    self.flags[flag] = self.flags.get(flag, 0) | bit
+
+            text = (
+                f"{item.get('sub_category', '')} {item.get('category', '')} "
+                f"{item.get('description', '')} {item.get('short_description', '')}"
+            ).lower()
+            for flag in TEXT_FLAGS:
+                if flag in text:
+                    self.flags[flag] = self.flags.get(flag, 0) | bit
+
+            for word in f"{item.get('category', '')} {item.get('sub_category', '')}".lower().split():
+                word = word.rstrip("s")
+                self.categories[word] = self.categories.get(word, 0) | bit
+
+            price = item_price(item)
+            if price is not None:
+                prices.append((price, pos))
+            rating = _to_number(item.get("star_rating"))
+            if rating is not None:
+                ratings.append((rating, pos))
+
+        self.price_values, self.price_prefix = self._prefix_masks(prices)
+        self.rating_values, self.rating_prefix = self._prefix_masks(ratings)
+
+        # Fixed-threshold ranges are precomputed like any other flag
+        self.flags["luxury"] = self._at_least(self.rating_values, self.rating_prefix, settings.facet_luxury_min_rating)
+        self.flags["budget"] = self._at_most(self.price_values, self.price_prefix, settings.facet_budget_max_price)
+
+    @staticmethod
+    def _prefix_masks(pairs: List[Tuple[float, int]]) -> Tuple[List[float], List[int]]:
+        """
+        Distinct sorted values and cumulative masks: prefix[j] has the items
+        whose value is below values[j] (prefix[-1] has them all), so any
+        range query is a bisect plus one mask operation.
+        """
+        pairs.sort()
+        values: List[float] = []
+        prefix = [0]
+        for value, pos in pairs:
+            if not values or value != values[-1]:
+                values.append(value)
+                prefix.append(prefix[-1])
+            prefix[-1] |= 1 << pos
+        return values, prefix
+
+    @staticmethod
+    def _at_most(values: List[float], prefix: List[int], high: float) -> int:
+        return prefix[bisect_right(values, high)]
+
+    @staticmethod
+    def _at_least(values: List[float], prefix: List[int], low: float) -> int:
+        return prefix[-1] & ~prefix[bisect_left(values, low)]
+
+    def mask_for(self, category: str, intent: Dict[str, Any]) -> int:
+        """
+        Bitset of items matching the category and every intent filter.
+        """
+        mask = self.categories.get(category.lower().rstrip("s"), 0)
+
+        for need in intent.get("must_have", []):
+            if not mask:
+                break
+            mask &= self.flags.get(need, 0)
+
+        if mask and intent.get("max_price") is not None:
+            mask &= self._at_most(self.price_values, self.price_prefix, intent["max_price"])
+        if mask and intent.get("min_rating") is not None:
+            mask &= self._at_least(self.rating_values, self.rating_prefix, intent["min_rating"])
+
+        return mask
+
+    def matches(self, mask: int, item: Dict[str, Any]) -> bool:
+        pos = self.positions.get(item_key(item))
+        return pos is not None and bool(mask >> pos & 1)
+
+
+_index: FacetIndex | None = None
+
+
+def get_facet_index() -> FacetIndex | None:
+    """
+    Facet index for the current catalogue, rebuilt when the catalogue changes.
+    """
+    global _index
+
+    catalogue = get_catalogue()
+    if catalogue is None:
+        return None
+    if _index is None or _index.catalogue is not catalogue:
+        _index = FacetIndex(catalogue)
+    return _index
+
+
+def has_filters(intent: Dict[str, Any]) -> bool:
+    return bool(
+        intent.get("must_have")
+        or intent.get("max_price") is not None
+        or intent.get("min_rating") is not None
+    )
+
+
+def facet_search(category: str, intent: Dict[str, Any], limit: int) -> List[Dict[str, Any]] | None:
+    """
+    Catalogue items satisfying all intent filters, best rated first.
+    Returns None when there is no catalogue to search.
+    """
+    index = get_facet_index()
+    if index is None:
+        return None
+
+    mask = index.mask_for(category, intent)
+    results = []
+    for pos in _iter_bits(mask):
+        item = dict(index.items[pos])
+        item["_score"] = score_item(item, intent)
+        results.append(item)
+
+    results.sort(
+        key=lambda i: (i["_score"], _to_number(i.get("star_rating")) or 0),
+        reverse=True,
+    )
+    return results[:limit]
+
+
+def filter_items(items: List[Dict[str, Any]], category: str, intent: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Keep only items (e.g. geo results) that satisfy the intent filters.
+    """
+    index = get_facet_index()
+    if index is None:
+        return items
+
+    mask = index.mask_for(category, intent)
+    return [item for item in items if index.matches(mask, item)]
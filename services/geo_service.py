@@ -0,0 +1,223 @@
+# services/geo_service.py
+
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.catalogue_service import Catalogue, get_catalogue
+from services.data_service import normalize_name
+from utils.settings import get_settings
+
+settings = get_settings()
+
+EARTH_RADIUS_KM = 6371.0
+
+# Coordinate patterns seen in Google Maps links/embeds, most specific first
+_COORD_PATTERNS = [
+    (re.compile(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)"), False),   # place data: !3d<lat>!4d<lng>
+    (re.compile(r"!2d(-?\d+\.\d+)!3d(-?\d+\.\d+)"), True),    # embeds: !2d<lng>!3d<lat>
+    (re.compile(r"@(-?\d+\.\d+),(-?\d+\.\d+)"), False),       # /@<lat>,<lng>,<zoom>z
+    (re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)"), False),  # q=<lat>,<lng> or bare pair
+]
+
+
+def parse_coordinates(value: Any) -> Optional[Tuple[float, float]]:
+    """
+    Extract (lat, lng) from a google_location value, or None.
+    """
+    if not isinstance(value, str) or not value:
+        return None
+
+    for pattern, lng_first in _COORD_PATTERNS:
+        match = pattern.search(value)
+        if not match:
+            continue
+        a, b = float(match.group(1)), float(match.group(2))
+        lat, lng = (b, a) if lng_first else (a, b)
+        if -90 <= lat <= 90 and -180 <= lng <= 180 and (lat, lng) != (0.0, 0.0):
+            return lat, lng
+    return None
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    h = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def _cell(lat: float, lng: float) -> Tuple[int, int]:
+    return int(math.floor(lat / settings.geo_cell_deg)), int(math.floor(lng / settings.geo_cell_deg))
+
+
+class GeoIndex:
+    """
+    Uniform lat/lng grid over catalogue items plus an area -> items map.
+    """
+
+    def __init__(self, catalogue: Catalogue):
+        self.catalogue = catalogue
+        self.points: List[Tuple[float, float, Dict[str, Any]]] = []
+        self.grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.areas: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.coords: Dict[int, Tuple[float, float]] = {}
+
+        for item in catalogue.items:
+            coords = parse_coordinates(item.get("google_location"))
+            if coords:
+                self.coords[id(item)] = coords
+                self.grid[_cell(*coords)].append(len(self.points))
+                self.points.append((coords[0], coords[1], item))
+
+            for area in (item.get("area_name"), item.get("zone_name")):
+                key = normalize_name(area) if isinstance(area, str) else ""
+                if key:
+                    self.areas[key].append(item)
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        max_radius_km: float = settings.geo_max_radius_km,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        k nearest items within max_radius_km, as (distance_km, item).
+        Scans grid rings outward and stops once no closer item is possible.
+        """
+        if not self.points:
+            return []
+
+        row, col = _cell(lat, lng)
+        cell_km = settings.geo_cell_deg * 111.0 * max(math.cos(math.radians(lat)), 0.1)
+        max_ring = int(max_radius_km / cell_km) + 1
+
+        best: List[Tuple[float, int]] = []  # max-heap via negated distance
+        for ring in range(max_ring + 1):
+            for r in range(row - ring, row + ring + 1):
+                for c in range(col - ring, col + ring + 1):
+                    if max(abs(r - row), abs(c - col)) != ring:
+                        continue  # only the ring's border cells
+                    for idx in self.grid.get((r, c), ()):
+                        p_lat, p_lng, _ = self.points[idx]
+                        d = haversine_km(lat, lng, p_lat, p_lng)
+                        if d > max_radius_km:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-d, idx))
+                        elif d < -best[0][0]:
+                            heapq.heapreplace(best, (-d, idx))
+
+            # Every unscanned cell is at least `ring` cells away
+            if len(best) >= k and -best[0][0] <= ring * cell_km:
+                break
+
+        return [(-neg_d, self.points[idx][2]) for neg_d, idx in sorted(best, reverse=True)]
+
+    def _match_area(self, key: str) -> Optional[str]:
+        """
+        The area named in `key`: an exact match, else the longest area
+        whose whole tokens appear in order inside it ("cbs area" -> "cbs").
+        A bare prefix never selects a sub-area ("nashik" is not
+        "nashik road").
+        """
+        if key in self.areas:
+            return key
+
+        padded = f" {key} "
+        matches = [a for a in self.areas if f" {a} " in padded]
+        return max(matches, key=len) if matches else None
+
+    def resolve_anchor(
+        self,
+        place: str,
+        area_only: bool = False,
+    ) -> Optional[Tuple[Optional[Tuple[float, float]], List[Dict[str, Any]]]]:
+        """
+        Resolve a place name to (coordinates, area_items).
+        Areas win over entity names; coordinates may be None for areas whose
+        items carry no location.
+        """
+        key = normalize_name(place)
+        if not key:
+            return None
+
+        area_key = self._match_area(key)
+        if area_key:
+            items = self.areas[area_key]
+            located = [self.coords[id(i)] for i in items if id(i) in self.coords]
+            centroid = None
+            if located:
+                centroid = (
+                    sum(p[0] for p in located) / len(located),
+                    sum(p[1] for p in located) / len(located),
+                )
+            return centroid, items
+
+        if area_only:
+            return None
+
+        item = self.catalogue.by_name.get(key)
+        if item is not None and id(item) in self.coords:
+            return self.coords[id(item)], []
+
+        return None
+
+
+_index: GeoIndex | None = None
+
+
+def get_geo_index() -> GeoIndex | None:
+    """
+    Geo index for the current catalogue, rebuilt when the catalogue changes.
+    """
+    global _index
+
+    catalogue = get_catalogue()
+    if catalogue is None:
+        return None
+    if _index is None or _index.catalogue is not catalogue:
+        _index = GeoIndex(catalogue)
+    return _index
+
+
+def find_near(
+    place: str,
+    category: str,
+    limit: int,
+    area_only: bool = False,
+) -> List[Dict[str, Any]] | None:
+    """
+    Catalogue items of `category` near `place`, closest first.
+    With area_only, `place` must name an area and its own items are returned.
+    Returns None when the place can't be resolved locally, so callers
+    fall back to the search API; [] when it resolved but nothing matches.
+    """
+    index = get_geo_index()
+    if index is None:
+        return None
+
+    anchor = index.resolve_anchor(place, area_only=area_only)
+    if anchor is None:
+        return None
+    coords, area_items = anchor
+
+    category = category.lower()
+
+    def in_category(item: Dict[str, Any]) -> bool:
+        text = f"{item.get('category', '')} {item.get('sub_category', '')}".lower()
+        return category in text
+
+    if coords is not None and not area_only:
+        hits = index.nearest(coords[0], coords[1], k=limit * 4)
+        results = [
+            dict(item, _distance_km=round(d, 2))
+            for d, item in hits if in_category(item)
+        ]
+    else:
+        results = [dict(item) for item in area_items if in_category(item)]
+
+    return results[:limit]
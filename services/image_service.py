@@ -0,0 +1,311 @@
+# services/image_service.py
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+
+from utils.image_utils import CDN_BASE
+from utils.settings import get_settings
+
+settings = get_settings()
+
+# Only card-sized variants are produced, so the cache can't be flooded
+ALLOWED_WIDTHS = (160, 320, 480, 640)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", 80),
+    "jpeg": ("JPEG", "image/jpeg", 82),
+}
+
+_executor = None
+_inflight: Dict[str, asyncio.Future] = {}
+_cache_bytes: int | None = None
+_evict_lock = asyncio.Lock()
+
+# Eviction frees space down to this share of IMAGE_CACHE_MAX_MB, so the
+# directory is scanned once per batch of evictions rather than per miss
+EVICT_LOW_WATER = 0.9
+
+
+class ImageError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _resize(data: bytes, width: int, fmt: str) -> bytes:
+    # Runs in a worker process: decoding/resizing is CPU-bound and holds the GIL
+    from PIL import Image, ImageOps
+
+    pil_format, _, quality = FORMATS[fmt]
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.LANCZOS)
+        if img.mode not in ("RGB", "L") and pil_format == "JPEG":
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, pil_format, quality=quality, optimize=True)
+        return out.getvalue()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # Imported on first use: spawning workers is only needed for /img
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # forkserver: workers start from a clean process instead of forking
+        # this one (event loop, threads, open sockets)
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.image_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _executor
+
+
+def shutdown_image_workers():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# ------------------------
+# On-disk LRU cache
+# ------------------------
+def _scan() -> List[Tuple[float, int, Path]]:
+    entries = []
+    for p in settings.image_cache_dir.glob("*.img"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    return entries
+
+
+async def _cache_size() -> int:
+    global _cache_bytes
+    if _cache_bytes is None:
+        settings.image_cache_dir.mkdir(parents=True, exist_ok=True)
+        _cache_bytes = sum(size for _, size, _ in await asyncio.to_thread(_scan))
+    return _cache_bytes
+
+
+def _evict(needed: int) -> int:
+    """
+    Drop least recently used variants (by mtime, touched on every hit)
+    until `needed` more bytes fit under the low-water mark. Runs in a
+    thread; returns the remaining cache size.
+    """
+    entries = sorted(_scan())
+    total = sum(size for _, size, _ in entries)
+    target = settings.image_cache_max_bytes * EVICT_LOW_WATER - needed
+    for _, size, p in entries:
+        if total <= target:
+            break
+        try:
+            p.unlink()
+            total -= size
+        except FileNotFoundError:
+            pass
+        p.with_suffix(".json").unlink(missing_ok=True)
+    return total
+
+
+async def _make_room(needed: int):
+    global _cache_bytes
+    if await _cache_size() + needed <= settings.image_cache_max_bytes:
+        return
+    async with _evict_lock:
+        # Another build may have evicted while we waited
+        if _cache_bytes + needed <= settings.image_cache_max_bytes:
+            return
+        _cache_bytes = await asyncio.to_thread(_evict, needed)
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+async def _store(path: Path, data: bytes):
+    global _cache_bytes
+    await _make_room(len(data))
+    try:
+        replaced = path.stat().st_size  # rebuilt after revalidation
+    except FileNotFoundError:
+        replaced = 0
+    _write_atomic(path, data)
+    _cache_bytes += len(data) - replaced
+
+
+def _variant_key(src: str, width: int, fmt: str) -> str:
+    return hashlib.sha1(f"{src}|{width}|{fmt}".encode()).hexdigest()
+
+
+def _paths(key: str) -> Tuple[Path, Path]:
+    # The variant and its metadata: content ETag, source validators, last check
+    base = settings.image_cache_dir / key
+    return base.with_suffix(".img"), base.with_suffix(".json")
+
+
+def _read_meta(meta_path: Path) -> Dict | None:
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(meta: Dict) -> bool:
+    return time.time() - meta.get("checked_at", 0) < settings.image_max_age_seconds
+
+
+# ------------------------
+# Variant lookup
+# ------------------------
+def normalize_source(src: str) -> str:
+    """
+    Accept a CDN path or full CDN URL; anything else is rejected so the
+    endpoint can't be used to fetch arbitrary hosts.
+    """
+    src = (src or "").strip()
+    if src.startswith(CDN_BASE):
+        src = src[len(CDN_BASE):]
+    if not src or "://" in src or src.startswith("//") or ".." in src.split("/"):
+        raise ImageError(400, "Invalid image source")
+    return src.lstrip("/")
+
+
+async def _read_source(response: httpx.Response) -> bytes:
+    """
+    Read the source body, giving up as soon as it exceeds IMAGE_MAX_SOURCE_MB.
+    """
+    limit = settings.image_max_source_bytes
+    declared = response.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise ImageError(502, "Image source too large")
+
+    chunks = []
+    size = 0
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if size > limit:
+            raise ImageError(502, "Image source too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _build_variant(src: str, width: int, fmt: str, key: str, previous: Dict | None) -> Dict:
+    """
+    Fetch and resize the source, or, when `previous` metadata is given,
+    revalidate it with a conditional request first. Returns the metadata.
+    """
+    path, meta_path = _paths(key)
+    headers = {}
+    if previous:
+        if previous.get("source_etag"):
+            headers["If-None-Match"] = previous["source_etag"]
+        if previous.get("source_last_modified"):
+            headers["If-Modified-Since"] = previous["source_last_modified"]
+
+    try:
+        async with httpx.AsyncClient(timeout=settings.image_fetch_timeout) as client:
+            async with client.stream("GET", CDN_BASE + src, headers=headers) as response:
+                if response.status_code == 304 and previous:
+                    meta = {**previous, "checked_at": time.time()}
+                    _write_atomic(meta_path, json.dumps(meta).encode())
+                    return meta
+                if response.status_code == 404:
+                    raise ImageError(404, "Image not found")
+                if response.status_code >= 400:
+                    raise ImageError(502, "Image source unavailable")
+                source = await _read_source(response)
+                validators = {
+                    "source_etag": response.headers.get("etag"),
+                    "source_last_modified": response.headers.get("last-modified"),
+                }
+    except ImageError:
+        raise
+    except Exception as e:
+        print("[ERROR] Image fetch failed:", e)
+        raise ImageError(502, "Image source unavailable")
+
+    loop = asyncio.get_running_loop()
+    try:
+        data = await loop.run_in_executor(_get_executor(), _resize, source, width, fmt)
+    except Exception as e:
+        print("[ERROR] Image resize failed:", e)
+        raise ImageError(415, "Unsupported image")
+
+    meta = {
+        # Content-derived, so it only changes when the served bytes do
+        "etag": f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"',
+        **validators,
+        "checked_at": time.time(),
+    }
+    await _store(path, data)
+    _write_atomic(meta_path, json.dumps(meta).encode())
+    return meta
+
+
+def cached_etag(src: str, width: int, fmt: str) -> str | None:
+    """
+    ETag of a cached, still fresh variant, without fetching or building
+    anything; None when there isn't one (get_variant validates the input).
+    """
+    try:
+        key = _variant_key(normalize_source(src), width, fmt)
+    except ImageError:
+        return None
+    meta = _read_meta(_paths(key)[1])
+    if meta is None or not _is_fresh(meta):
+        return None
+    return meta.get("etag")
+
+
+async def get_variant(src: str, width: int, fmt: str) -> Tuple[Path, str, str]:
+    """
+    Return (file path, ETag, media type) for a card-sized variant,
+    fetching and resizing the source once. Variants older than
+    IMAGE_MAX_AGE_SECONDS are revalidated against the source. Concurrent
+    requests for the same variant share one build.
+    """
+    if width not in ALLOWED_WIDTHS:
+        raise ImageError(400, f"Width must be one of {ALLOWED_WIDTHS}")
+    if fmt not in FORMATS:
+        raise ImageError(400, f"Format must be one of {tuple(FORMATS)}")
+
+    src = normalize_source(src)
+    key = _variant_key(src, width, fmt)
+    path, meta_path = _paths(key)
+    media_type = FORMATS[fmt][1]
+
+    meta = _read_meta(meta_path) if path.exists() else None
+    if meta is not None and _is_fresh(meta):
+        try:
+            os.utime(path)  # LRU touch
+            return path, meta["etag"], media_type
+        except FileNotFoundError:
+            meta = None  # evicted meanwhile: rebuild
+
+    await _cache_size()  # ensure the cache dir exists before the first write
+    pending = _inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_build_variant(src, width, fmt, key, meta))
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    meta = await asyncio.shield(pending)
+    return path, meta["etag"], media_type
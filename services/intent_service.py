@@ -1,3 +1,4 @@
+import re
 from typing import Dict, Any, List, Optional
 
 # Attribute keywords for entity-level queries
@@ -41,19 +42,119 @@ def detect_attribute(query: str) -> Optional[str]:
     return None
 
 
+# Canonical category -> words that ask for it. A query may name several
+# ("villas and resorts"); each becomes its own sub-query.
+CATEGORY_KEYWORDS = {
+    "hotel": ["hotel", "lodge"],
+    "villa": ["villa"],
+    "resort": ["resort"],
+    "homestay": ["homestay", "home stay"],
+    "farmhouse": ["farmhouse", "farm house"],
+    "cottage": ["cottage"],
+    "restaurant": ["restaurant", "dining"],
+    "cafe": ["cafe", "café"],
+}
+
+
+def detect_categories(q: str) -> List[str]:
+    """
+    Categories named in the (lowercased) query, in the order they appear.
+    """
+    found = []
+    for category, words in CATEGORY_KEYWORDS.items():
+        positions = [m.start() for w in words for m in re.finditer(r"\b" + re.escape(w), q)]
+        if positions:
+            found.append((min(positions), category))
+    return [category for _, category in sorted(found)]
+
+
+# Follow-ups answered from the session's last results ("show more",
+# "any cheaper ones?"). Only short queries made entirely of these words
+# count; anything else ("more villas in CBS") is a new search.
+FOLLOW_UP_TRIGGERS = {
+    "more": {"more", "next", "other", "others"},
+    "cheaper": {"cheaper", "cheapest", "affordable"},
+}
+FOLLOW_UP_CHEAPER_PHRASES = re.compile(r"\b(?:less expensive|lower price)")
+FOLLOW_UP_FILLER = {
+    "show", "me", "some", "any", "give", "see", "the", "a", "few", "please",
+    "ones", "one", "options", "option", "results", "page", "something",
+    "anything", "less", "lower", "expensive", "price", "priced", "than",
+    "these", "those", "can", "you", "i", "want", "are", "there",
+}
+
+
+def detect_follow_up(query: str) -> Optional[str]:
+    """
+    Return the follow-up kind ("more" | "cheaper") or None.
+    """
+    words = re.findall(r"[a-z]+", query.lower())
+    if not words or len(words) > 6:
+        return None
+
+    kind = None
+    for word in words:
+        if word in FOLLOW_UP_TRIGGERS["cheaper"]:
+            kind = "cheaper"
+        elif word in FOLLOW_UP_TRIGGERS["more"]:
+            kind = kind or "more"
+        elif word not in FOLLOW_UP_FILLER:
+            return None
+
+    if FOLLOW_UP_CHEAPER_PHRASES.search(" ".join(words)):
+        kind = "cheaper"
+    return kind
+
+
+# Clauses that end a place name: "in gangapur road with pool" -> "gangapur road"
+PLACE_END = re.compile(
+    r"\s+(?:with|under|below|for|that|which|having|and|or|within|upto|up to|"
+    r"less than|near|nearby|around|close to|in)\b.*$"
+)
+# Phrases after "in" that aren't places ("what's in store")
+NOT_PLACES = {"store", "stock", "mind", "general", "detail", "details", "it", "there", "here"}
+
+
+# "under 5000" / "within rs 2,500", but not "within 2 km" or "up to 4 star"
+PRICE_PATTERN = re.compile(
+    r"\b(?:under|below|less than|upto|up to|within)\s*(rs\.?|₹|inr)?\s*(\d[\d,]*(?:\.\d+)?)(?![\d,.])"
+    r"(?!\s*(?:km|kms|kilomet|mile|m\b|meter|metre|min|hour|hr|day|night|star|people|person|"
+    r"guest|adult|kid|child|room|bed|bhk))"
+)
+# Without a currency marker, smaller numbers aren't prices ("under 5")
+MIN_BARE_PRICE = 100
+# "4 star" is a minimum; "up to 4 star" is a ceiling, which isn't a filter
+RATING_PATTERN = re.compile(
+    r"\b(?:(under|below|less than|upto|up to|within|max|maximum)\s+)?([1-5](?:\.\d)?)\s*[- ]?star"
+)
+
+
+def clean_place(text: str) -> Optional[str]:
+    """
+    Trim a captured place name to the place itself, or None.
+    """
+    place = PLACE_END.sub("", text.strip(" ?.!,")).strip(" ?.!,")
+    if not place or place in NOT_PLACES:
+        return None
+    return place
+
+
 def extract_intent(query: str) -> Dict[str, Any]:
     q = query.lower()
 
     intent = {
-        "category": "hotel",
+        "category": "hotel",        # primary category (first one named)
+        "categories": ["hotel"],    # every category to search
         "type": "generic_search",   # generic_search | filtered_search | entity_lookup
         "keywords": [],
         "must_have": [],
     }
 
     # ---- category detection ----
-    if "villa" in q:
-        intent["category"] = "villa"
+    categories = detect_categories(q)
+    if categories:
+        intent["category"] = categories[0]
+        intent["categories"] = categories
 
     # ---- filters ----
     if "pool" in q:
@@ -72,6 +173,45 @@ def extract_intent(query: str) -> Dict[str, Any]:
     if "budget" in q or "cheap" in q:
         intent["must_have"].append("budget")
 
+    # Amenity flags (answered by the catalogue facet index)
+    if "parking" in q:
+        intent["must_have"].append("parking")
+
+    if re.search(r"\bpets?\b|pet-friendly", q):
+        intent["must_have"].append("pet_friendly")
+
+    if re.search(r"\bac\b|air[- ]condition", q):
+        intent["must_have"].append("air_conditioned")
+
+    if "wifi" in q or "wi-fi" in q:
+        intent["must_have"].append("wifi")
+
+    # ---- ranges ----
+    price_match = PRICE_PATTERN.search(q)
+    if price_match:
+        price = float(price_match.group(2).replace(",", ""))
+        if price_match.group(1) or price >= MIN_BARE_PRICE:
+            intent["max_price"] = price
+
+    rating_match = RATING_PATTERN.search(q)
+    if rating_match and not rating_match.group(1):
+        intent["min_rating"] = float(rating_match.group(2))
+
+    # ---- location ----
+    # "near X" -> proximity search, "in X" -> area search (resolved against
+    # the catalogue's geo index; unresolved places fall back to the API)
+    near_match = re.search(r"\b(?:near|nearby|around|close to)\s+(.+)", q)
+    if near_match:
+        place = clean_place(near_match.group(1))
+        if place:
+            intent["near"] = place
+    else:
+        in_match = re.search(r"\bin\s+(.+)", q)
+        if in_match:
+            place = clean_place(in_match.group(1))
+            if place:
+                intent["area"] = place
+
     # ---- entity lookup ----
     # Token-based entity name extraction (avoids string corruption)
     STOPWORDS = {
@@ -1,19 +1,43 @@
 # services/llm_service.py
 
-import os
-from typing import Dict
-from dotenv import load_dotenv
-from groq import Groq
+import asyncio
+from typing import Dict, List
 
-load_dotenv()
+from utils import deadline
+from utils.settings import get_settings
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+settings = get_settings()
 
 # ✅ VERIFIED WORKING MODEL
 MODEL_NAME = "llama-3.3-70b-versatile"
 
-# ✅ Initialize Groq client once
-client = Groq(api_key=GROQ_API_KEY)
+NO_DATA_ANSWER = "No matching data found for your request. Please try a different search."
+
+_client = None
+
+
+def get_client():
+    """
+    The Groq client, created once on first use (or by init_llm_client at
+    startup) so importing this module stays cheap.
+    """
+    global _client
+    if _client is None:
+        from groq import Groq
+
+        _client = Groq(api_key=settings.groq_api_key or None)
+    return _client
+
+
+def init_llm_client():
+    """
+    Build the client during app startup instead of on the first /ask.
+    Failures are logged; get_client() retries lazily.
+    """
+    try:
+        get_client()
+    except Exception as e:
+        print("[ERROR] Groq client init failed:", e)
 
 
 async def answer_with_ai(
@@ -21,15 +45,17 @@ async def answer_with_ai(
     context: str,
     intent: Dict,
     memory: str
-) -> str:
+) -> str | None:
     """
     Final LLM call using Groq (cloud).
     Fully replaces Ollama.
+    Returns None when the call times out, so callers can answer from a
+    template instead.
     """
 
     # ✅ HARD SAFETY: No hallucinations when data is empty
     if not context or context.strip() == "":
-        return "No matching data found for your request. Please try a different search."
+        return NO_DATA_ANSWER
 
     system_msg = f"""
 You are Anvi AI, a Nashik-based travel assistant.
@@ -55,18 +81,49 @@ CONTEXT:
 """
 
     try:
-        completion = client.chat.completions.create(
+        # Groq's client is synchronous; run it off the event loop
+        completion = await asyncio.to_thread(
+            get_client().chat.completions.create,
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_msg},
                 {"role": "user", "content": user_msg}
             ],
             temperature=0.2,
-            top_p=0.9
+            top_p=0.9,
+            timeout=deadline.timeout(settings.llm_timeout_seconds),
         )
 
         return completion.choices[0].message.content.strip()
 
     except Exception as e:
+        from groq import APITimeoutError
+
+        if isinstance(e, APITimeoutError):
+            print("[DEBUG] LLM call timed out")
+            return None
         print("[ERROR] GROQ FAILURE:", e)
         return "LLM is temporarily unavailable. Please try again."
+
+
+def template_answer(items: List[Dict]) -> str:
+    """
+    Deterministic answer used when the deadline leaves no time for the LLM.
+    """
+    if not items:
+        return NO_DATA_ANSWER
+
+    lines = ["Here are some options I found:"]
+    for i, item in enumerate(items[:8], start=1):
+        name = item.get("vendor_name") or item.get("name") or "Unknown"
+        area = item.get("area_name") or item.get("zone_name")
+        rating = item.get("star_rating") or item.get("rating")
+        line = f"{i}. {name}"
+        if area:
+            line += f" – {area}"
+        if rating:
+            line += f" ({rating}★)"
+        lines.append(line)
+
+    lines.append("\nWould you like more details on any of these?")
+    return "\n".join(lines)
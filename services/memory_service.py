@@ -1,38 +1,327 @@
-from services.db import get_db_pool
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from services.db import (
+    acquire,
+    close_db_pool,
+    fetch,
+    init_db_pool,
+    query_timeout,
+    register_statement,
+)
+from utils.settings import get_settings
+
+settings = get_settings()
 
 MAX_HISTORY = 10
 
+# Hot queries, prepared once per pooled connection
+SAVE_MESSAGE_SQL = register_statement(
+    """
+    INSERT INTO chat_messages (app_user_id, role, content)
+    VALUES ($1, $2, $3)
+    """
+)
 
-async def save_message(app_user_id: str, role: str, content: str):
-    pool = await get_db_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO chat_messages (app_user_id, role, content)
-            VALUES ($1, $2, $3)
-            """,
-            app_user_id,
-            role,
-            content
+RECENT_MESSAGES_SQL = register_statement(
+    """
+    SELECT role, content
+    FROM chat_messages
+    WHERE app_user_id = $1
+    ORDER BY created_at DESC
+    LIMIT $2
+    """
+)
+
+
+class MemoryStore(ABC):
+    """
+    Chat history backend. Messages for a user are returned oldest first.
+    """
+    name = ""
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def save_message(self, app_user_id: str, role: str, content: str):
+        await self.save_messages(app_user_id, [(role, content)])
+
+    @abstractmethod
+    async def save_messages(self, app_user_id: str, messages: list[tuple[str, str]]):
+        ...
+
+    @abstractmethod
+    async def get_recent_messages(self, app_user_id: str, limit: int = MAX_HISTORY) -> list[dict]:
+        ...
+
+
+# ------------------------
+# Postgres (asyncpg pool)
+# ------------------------
+class PostgresMemory(MemoryStore):
+    name = "postgres"
+
+    async def start(self):
+        await init_db_pool()
+
+    async def close(self):
+        await close_db_pool()
+
+    async def save_message(self, app_user_id: str, role: str, content: str):
+        async with acquire() as conn:
+            await fetch(
+                conn,
+                SAVE_MESSAGE_SQL,
+                app_user_id,
+                role,
+                content
+            )
+
+    async def save_messages(self, app_user_id: str, messages: list[tuple[str, str]]):
+        """
+        Persist several (role, content) messages in one round trip.
+        Rows get strictly increasing created_at values so history keeps the
+        given order.
+        """
+        if not messages:
+            return
+
+        roles = [role for role, _ in messages]
+        contents = [content for _, content in messages]
+
+        async with acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO chat_messages (app_user_id, role, content, created_at)
+                SELECT $1, m.role, m.content, now() + m.pos * interval '1 microsecond'
+                FROM unnest($2::text[], $3::text[]) WITH ORDINALITY AS m(role, content, pos)
+                ORDER BY m.pos
+                """,
+                app_user_id,
+                roles,
+                contents,
+                timeout=query_timeout(),
+            )
+
+    async def get_recent_messages(self, app_user_id: str, limit: int = MAX_HISTORY) -> list[dict]:
+        async with acquire() as conn:
+            rows = await fetch(
+                conn,
+                RECENT_MESSAGES_SQL,
+                app_user_id,
+                limit
+            )
+
+        return [
+            {"role": r["role"], "content": r["content"]}
+            for r in reversed(rows)
+        ]
+
+
+# ------------------------
+# Embedded SQLite (WAL)
+# ------------------------
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY,
+    app_user_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+);
+CREATE INDEX IF NOT EXISTS chat_messages_user_id ON chat_messages (app_user_id, id);
+"""
+
+
+class SQLiteMemory(MemoryStore):
+    """
+    Single-file store for single-node and edge deployments.
+    sqlite3 blocks, so all calls run off the event loop: writes on one
+    writer thread, reads on a small pool with a connection each (WAL lets
+    them run alongside the writer).
+    Group commit: writes that arrive while a commit is in flight (or
+    within an optional `commit_window`) share the next transaction, so
+    under load many requests pay for one commit.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: Path, readers: int, commit_window: float, commit_max: int):
+        self.path = path
+        self.readers = max(1, readers)
+        self.commit_window = commit_window
+        self.commit_max = max(1, commit_max)
+
+        self._writer = None
+        self._reader_pool = None
+        self._writer_conn: sqlite3.Connection | None = None
+        self._reader_conns: list[sqlite3.Connection] = []
+        self._local = threading.local()
+        self._start_lock = asyncio.Lock()
+        self._pending: list[tuple[list, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _open_writer(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer_conn = self._connect()
+        self._writer_conn.executescript(SQLITE_SCHEMA)
+
+    async def start(self):
+        async with self._start_lock:
+            if self._writer is not None:
+                return
+            from concurrent.futures import ThreadPoolExecutor
+
+            writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+            await asyncio.get_running_loop().run_in_executor(writer, self._open_writer)
+            self._reader_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="memory-reader")
+            self._writer = writer
+            print(f"[DEBUG] SQLite memory ready at {self.path}")
+
+    async def close(self):
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._writer is None:
+            return
+        self._writer.shutdown(wait=True)
+        self._reader_pool.shutdown(wait=True)
+        for conn in [self._writer_conn, *self._reader_conns]:
+            conn.close()
+        self._writer = self._reader_pool = self._writer_conn = None
+        self._reader_conns = []
+        self._local = threading.local()
+
+    # ---- writes ----
+    def _commit(self, rows: list[tuple[str, str, str]]):
+        conn = self._writer_conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO chat_messages (app_user_id, role, content) VALUES (?, ?, ?)",
+                rows,
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    async def _flush(self):
+        if self.commit_window > 0:
+            await asyncio.sleep(self.commit_window)
+
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch = self._pending[:self.commit_max]
+            del self._pending[:self.commit_max]
+            rows = [row for group, _ in batch for row in group]
+            try:
+                await loop.run_in_executor(self._writer, self._commit, rows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def save_messages(self, app_user_id: str, messages: list[tuple[str, str]]):
+        if not messages:
+            return
+        await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(([(app_user_id, role, content) for role, content in messages], future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush())
+        # Row order within a request is kept: one executemany, ascending ids
+        await future
+
+    # ---- reads ----
+    def _read(self, app_user_id: str, limit: int) -> list[dict]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._reader_conns.append(conn)
+        rows = conn.execute(
+            "SELECT role, content FROM chat_messages WHERE app_user_id = ? ORDER BY id DESC LIMIT ?",
+            (app_user_id, limit),
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    async def get_recent_messages(self, app_user_id: str, limit: int = MAX_HISTORY) -> list[dict]:
+        await self.start()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._reader_pool, self._read, app_user_id, limit
         )
 
 
-async def get_recent_messages(app_user_id: str, limit: int = MAX_HISTORY):
-    pool = await get_db_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT role, content
-            FROM chat_messages
-            WHERE app_user_id = $1
-            ORDER BY created_at DESC
-            LIMIT $2
-            """,
-            app_user_id,
-            limit
+# ------------------------
+# Backend selection
+# ------------------------
+def create_memory_store(backend: str) -> MemoryStore:
+    """
+    "postgres", "sqlite", or "auto" (Postgres when DATABASE_URL is set).
+    """
+    if backend == "auto":
+        backend = "postgres" if settings.database_url else "sqlite"
+    if backend == "postgres":
+        return PostgresMemory()
+    if backend == "sqlite":
+        return SQLiteMemory(
+            settings.memory_sqlite_path,
+            readers=settings.memory_sqlite_readers,
+            commit_window=settings.memory_group_commit_ms / 1000.0,
+            commit_max=settings.memory_group_commit_max,
         )
+    raise ValueError(f"Unknown MEMORY_BACKEND: {backend}")
+
+
+_store: MemoryStore | None = None
 
-    return [
-        {"role": r["role"], "content": r["content"]}
-        for r in reversed(rows)
-    ]
+
+def get_memory_store() -> MemoryStore:
+    global _store
+    if _store is None:
+        _store = create_memory_store(settings.memory_backend)
+    return _store
+
+
+async def init_memory():
+    """
+    Open the backend at startup. Failures are logged; each call retries.
+    """
+    store = get_memory_store()
+    try:
+        await store.start()
+    except Exception as e:
+        print(f"[ERROR] Memory backend '{store.name}' init failed:", e)
+
+
+async def close_memory():
+    if _store is not None:
+        await _store.close()
+
+
+async def save_message(app_user_id: str, role: str, content: str):
+    await get_memory_store().save_message(app_user_id, role, content)
+
+
+async def save_messages(app_user_id: str, messages: list[tuple[str, str]]):
+    await get_memory_store().save_messages(app_user_id, messages)
+
+
+async def get_recent_messages(app_user_id: str, limit: int = MAX_HISTORY):
+    return await get_memory_store().get_recent_messages(app_user_id, limit)
@@ -0,0 +1,200 @@
+# services/popular_service.py
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from services.cluster_service import register_invalidation
+from services.llm_service import answer_with_ai
+from services.rag_service import get_rag_results
+from utils.settings import get_settings
+
+settings = get_settings()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+INTENT_KEY_FIELDS = ("categories", "must_have", "max_price", "min_rating", "near", "area")
+
+
+def intent_key(intent: Dict[str, Any]) -> Tuple:
+    """
+    Canonical form of a search intent: queries that search for the same
+    thing share one key regardless of wording or filter order.
+    """
+    return (
+        tuple(sorted(intent.get("categories") or [intent.get("category")])),
+        tuple(sorted(set(intent.get("must_have", [])))),
+        intent.get("max_price"),
+        intent.get("min_rating"),
+        intent.get("near"),
+        intent.get("area"),
+    )
+
+
+# ------------------------
+# Frequency sketch
+# ------------------------
+class SpaceSaving:
+    """
+    Space-saving top-k counter: tracks at most `capacity` keys. A new key
+    replaces the least counted one and inherits its count (as error), so
+    frequent keys are never lost. Counts are decayed periodically so the
+    ranking follows recent traffic.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[Tuple, float] = {}
+        self.samples: Dict[Tuple, Tuple[str, Dict]] = {}
+
+    def add(self, key: Tuple, query: str, intent: Dict):
+        if self.capacity <= 0:
+            return
+        if key in self.counts:
+            self.counts[key] += 1
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = 1
+        else:
+            # O(capacity), only on a miss with a full table
+            victim = min(self.counts, key=self.counts.get)
+            self.counts[key] = self.counts.pop(victim) + 1
+            self.samples.pop(victim, None)
+        # Latest wording is kept as the one to precompute an answer for
+        self.samples[key] = (query, intent)
+
+    def top(self, k: int, min_count: float) -> List[Tuple[Tuple, float]]:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return [(key, count) for key, count in ranked[:k] if count >= min_count]
+
+    def decay(self, factor: float):
+        for key in list(self.counts):
+            self.counts[key] *= factor
+
+
+# ------------------------
+# Warm entries
+# ------------------------
+@dataclass
+class WarmEntry:
+    query: str  # normalized wording the answer was generated for
+    context: str
+    items: List[Dict[str, Any]]
+    answer: str | None
+    built_at: float
+
+
+sketch = SpaceSaving(settings.popular_sketch_size)
+_warm: Dict[Tuple, WarmEntry] = {}
+_rewarm = asyncio.Event()
+_stats = {"hits": 0, "answer_hits": 0, "misses": 0}
+
+
+def record(query: str, intent: Dict[str, Any]):
+    sketch.add(intent_key(intent), normalize_query(query), intent)
+
+
+def lookup(intent: Dict[str, Any]) -> WarmEntry | None:
+    """
+    Warmed search results for this intent, if it is currently popular.
+    """
+    entry = _warm.get(intent_key(intent))
+    if entry is None or time.time() - entry.built_at > settings.popular_max_age_seconds:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return entry
+
+
+def warm_answer(entry: WarmEntry, query: str) -> str | None:
+    """
+    The precomputed answer, only for the exact (normalized) wording it was
+    generated for. It was written without conversation history.
+    """
+    if entry.answer and entry.query == normalize_query(query):
+        _stats["answer_hits"] += 1
+        return entry.answer
+    return None
+
+
+def _invalidate():
+    # Warm entries hold catalogue items; rebuild them after a refresh
+    _warm.clear()
+    _rewarm.set()
+
+
+register_invalidation(_invalidate)
+
+
+async def _warm_one(key: Tuple, query: str, intent: Dict[str, Any]):
+    context, items = await get_rag_results(intent["category"], "", intent)
+    answer = None
+    if context and settings.popular_precompute_answers:
+        answer = await answer_with_ai(query=query, context=context, intent=intent, memory="")
+    _warm[key] = WarmEntry(
+        query=query,
+        context=context,
+        items=items,
+        answer=answer,
+        built_at=time.time(),
+    )
+
+
+async def warm_popular():
+    """
+    Precompute results (and answers) for the current top intents and drop
+    entries that are no longer popular.
+    """
+    top = sketch.top(settings.popular_top_k, settings.popular_min_count)
+    keys = {key for key, _ in top}
+    for key in list(_warm):
+        if key not in keys:
+            del _warm[key]
+
+    # Snapshot the samples: the sketch keeps changing while we await
+    work = [(key, *sketch.samples[key]) for key, _ in top]
+    for key, query, intent in work:
+        try:
+            await _warm_one(key, query, intent)
+        except Exception as e:
+            print("[ERROR] Popular query warm-up failed:", e)
+
+    if top:
+        print(f"[DEBUG] Popular: warmed {len(top)} intents (top count {top[0][1]:.0f})")
+    sketch.decay(settings.popular_decay)
+
+
+async def _warm_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_rewarm.wait(), timeout=settings.popular_refresh_seconds)
+        except asyncio.TimeoutError:
+            pass
+        _rewarm.clear()
+        await warm_popular()
+
+
+def start_popular_warmer() -> asyncio.Task | None:
+    """
+    Start the background precompute job.
+    Disabled when POPULAR_TOP_K <= 0 or POPULAR_REFRESH_SECONDS <= 0.
+    """
+    if settings.popular_top_k <= 0 or settings.popular_refresh_seconds <= 0:
+        return None
+    return asyncio.create_task(_warm_loop())
+
+
+def get_popular_stats() -> dict:
+    return {
+        **_stats,
+        "tracked": len(sketch.counts),
+        "warm": len(_warm),
+        # Canonical intents only: raw query text is other users' input
+        "top": [
+            {**dict(zip(INTENT_KEY_FIELDS, key)), "count": round(count, 1)}
+            for key, count in sketch.top(settings.popular_top_k, 0)
+        ],
+    }
@@ -1,11 +1,18 @@
 # services/rag_service.py
 
 import asyncio
-from typing import List, Dict
+import math
+from typing import Dict, List, Tuple
 
-from services.data_service import search_api
+from services.catalogue_service import item_key
+from services.data_service import score_item, search_api
+from services.facet_service import facet_search, filter_items, has_filters
+from services.geo_service import find_near
+from utils import deadline
 
 MAX_RESULTS = 8  # enforce 6-8 item window for LLM consumption
+CANDIDATE_LIMIT = 30  # ranked candidates kept per search (session cursor pages through them)
+FAN_OUT_MERGE_SECONDS = 0.05  # multi-category searches stop this early to merge in time
 
 
 async def _format_item(item: Dict, index: int) -> str:
@@ -20,6 +27,7 @@ async def _format_item(item: Dict, index: int) -> str:
         or ""
     )
     desc = item.get("short_description") or item.get("description") or ""
+    distance = item.get("_distance_km")
 
     if desc and len(desc) > 200:
         desc = desc[:200].rstrip() + "..."
@@ -31,21 +39,45 @@ async def _format_item(item: Dict, index: int) -> str:
         f"Area: {area}\n"
         f"Rating: {rating}\n"
         f"Address: {address}\n"
-        f"Description: {desc}\n"
+        + (f"Distance: {distance} km\n" if distance is not None else "")
+        + f"Description: {desc}\n"
         f"----"
     )
 
 
-async def get_rag_context(keyword: str, session_id: str, intent: Dict) -> str:
+async def _find_items(keyword: str, intent: Dict, limit: int) -> List[Dict]:
     """
-    Uses ONLY the canonical category keyword from intent.
-    Fetch up to 30 API results → keep top MAX_RESULTS for RAG.
+    Answer from the local catalogue indexes when possible:
+    "near X" / "in X" via the geo index, must_have/price/rating filters via
+    the facet index. Otherwise (or with no catalogue) use the search API.
+    An empty local match is a real answer: only a missing catalogue or an
+    unknown place falls back to the API, which ignores the filters.
     """
+    filtered = has_filters(intent)
 
-    items = await search_api(keyword, intent, limit=30)
+    place = intent.get("near") or intent.get("area")
+    if place:
+        local = find_near(place, keyword, limit * 4 if filtered else limit, area_only=not intent.get("near"))
+        if local is not None:
+            if filtered:
+                local = filter_items(local, keyword, intent)[:limit]
+            print(f"[DEBUG] RAG: {len(local)} local geo results for '{place}'")
+            return local
 
+    if filtered:
+        local = facet_search(keyword, intent, limit)
+        if local is not None:
+            print(f"[DEBUG] RAG: {len(local)} local facet results")
+            return local
+
+    return await search_api(keyword, intent, limit=limit)
+
+
+async def format_context(items: List[Dict], session_id: str = "") -> str:
+    """
+    Format the top MAX_RESULTS items as the LLM context block.
+    """
     if not items:
-        print(f"[DEBUG] RAG: No items for keyword '{keyword}' | session={session_id}")
         return ""
 
     selected = items[:MAX_RESULTS]
@@ -61,6 +93,81 @@ async def get_rag_context(keyword: str, session_id: str, intent: Dict) -> str:
     return "\n".join(formatted).strip()
 
 
-async def get_rag_items(keyword: str, intent: Dict) -> List[Dict]:
-    items = await search_api(keyword, intent, limit=15)
-    return items or []
\ No newline at end of file
+def _rating(item: Dict) -> float:
+    try:
+        return float(item.get("star_rating") or item.get("rating") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def merge_ranked(results: List[List[Dict]], intent: Dict) -> List[Dict]:
+    """
+    Merge per-category result lists into one ranking, deduped by table_id.
+    Ordered by intent score, then distance (for "near"), then rank within
+    its own list (so categories interleave), then rating.
+    """
+    best: Dict[str, Tuple[tuple, Dict]] = {}
+    for items in results:
+        for position, item in enumerate(items):
+            score = item["_score"] if "_score" in item else score_item(item, intent)
+            distance = item.get("_distance_km")
+            rank = (
+                -score,
+                distance if distance is not None else math.inf,
+                position,
+                -_rating(item),
+            )
+            key = item_key(item)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, item)
+
+    return [item for _, item in sorted(best.values(), key=lambda entry: entry[0])]
+
+
+async def _fan_out(categories: List[str], intent: Dict, limit: int) -> List[Dict]:
+    """
+    Search every category concurrently under the request deadline.
+    Sub-queries still running at the deadline are dropped, not awaited.
+    """
+    tasks = [asyncio.ensure_future(_find_items(c, intent, limit)) for c in categories]
+
+    # Stop a moment early so there is time to merge and format before the
+    # caller's own deadline cancels us
+    timeout = deadline.timeout()
+    if timeout is not None:
+        timeout = max(0.0, timeout - FAN_OUT_MERGE_SECONDS)
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"[DEBUG] RAG: {len(pending)} of {len(tasks)} category searches missed the deadline")
+
+    results = []
+    for task in tasks:
+        if task in done and not task.exception():
+            results.append(task.result() or [])
+        elif task in done:
+            print("[ERROR] RAG category search failed:", task.exception())
+    return merge_ranked(results, intent)[:limit]
+
+
+async def get_rag_results(keyword: str, session_id: str, intent: Dict) -> Tuple[str, List[Dict]]:
+    """
+    Uses ONLY the canonical category keywords from intent.
+    One search (per category, concurrently) for up to CANDIDATE_LIMIT ranked
+    items; the top MAX_RESULTS become the RAG context.
+    Returns (context, all ranked items).
+    """
+    categories = intent.get("categories") or [keyword]
+    if len(categories) > 1:
+        items = await _fan_out(categories, intent, limit=CANDIDATE_LIMIT)
+        keyword = " + ".join(categories)
+    else:
+        items = await _find_items(categories[0], intent, limit=CANDIDATE_LIMIT)
+
+    if not items:
+        print(f"[DEBUG] RAG: No items for keyword '{keyword}' | session={session_id}")
+        return "", []
+
+    return await format_context(items, session_id), items
@@ -0,0 +1,150 @@
+# services/session_service.py
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from services.cluster_service import register_invalidation
+from services.facet_service import item_price
+from utils.settings import get_settings
+
+settings = get_settings()
+
+PAGE_SIZE = 8  # same window as the first answer's cards
+
+
+@dataclass
+class Cursor:
+    """
+    The ranked candidates of a session's last search and the window of
+    them shown most recently ([page_start, shown)).
+    """
+    keyword: str
+    intent: Dict[str, Any]
+    items: List[Dict[str, Any]]
+    page_start: int
+    shown: int
+    expires_at: float
+
+    @property
+    def page(self) -> List[Dict[str, Any]]:
+        return self.items[self.page_start:self.shown]
+
+
+class CursorStore:
+    """
+    Per-(user, session) cursors, kept in this worker's memory.
+    Bounded by TTL, number of sessions (LRU) and candidates per session.
+    A follow-up that lands on another worker, or after expiry, simply
+    falls back to a fresh search.
+    """
+
+    def __init__(self, ttl: float, max_sessions: int, max_items: int):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_items = max_items
+        self.cursors: "OrderedDict[Tuple[str, str], Cursor]" = OrderedDict()
+
+    def enabled(self, session_id: str) -> bool:
+        return bool(session_id) and self.ttl > 0 and self.max_sessions > 0
+
+    def save(self, user_id: str, session_id: str, keyword: str, intent: Dict, items: List[Dict], shown: int):
+        if not self.enabled(session_id):
+            return
+        key = (user_id, session_id)
+        if not items:
+            # Nothing found: follow-ups must not page the previous search
+            self.cursors.pop(key, None)
+            return
+        self.cursors[key] = Cursor(
+            keyword=keyword,
+            intent=intent,
+            items=items[:self.max_items],
+            page_start=0,
+            shown=min(shown, len(items)),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self.cursors.move_to_end(key)
+        while len(self.cursors) > self.max_sessions:
+            self.cursors.popitem(last=False)
+
+    def get(self, user_id: str, session_id: str) -> Cursor | None:
+        if not self.enabled(session_id):
+            return None
+        key = (user_id, session_id)
+        cursor = self.cursors.get(key)
+        if cursor is None:
+            return None
+        if cursor.expires_at <= time.monotonic():
+            del self.cursors[key]
+            return None
+        cursor.expires_at = time.monotonic() + self.ttl
+        self.cursors.move_to_end(key)
+        return cursor
+
+    def clear(self):
+        self.cursors.clear()
+
+
+cursors = CursorStore(
+    ttl=settings.session_cursor_ttl_seconds,
+    max_sessions=settings.session_cursor_max_sessions,
+    max_items=settings.session_cursor_max_items,
+)
+
+# Cursors hold catalogue items; drop them when the catalogue changes
+register_invalidation(cursors.clear)
+
+
+# ------------------------
+# Follow-ups
+# ------------------------
+def next_page(cursor: Cursor) -> List[Dict[str, Any]]:
+    """
+    "show more": the next PAGE_SIZE candidates of the last search.
+    """
+    page = cursor.items[cursor.shown:cursor.shown + PAGE_SIZE]
+    if page:
+        cursor.page_start = cursor.shown
+        cursor.shown += len(page)
+    return page
+
+
+def cheaper(cursor: Cursor) -> List[Dict[str, Any]]:
+    """
+    "any cheaper ones": candidates priced below the cheapest one just
+    shown, cheapest first. The cursor then pages through that refinement.
+    """
+    shown_prices = [p for p in map(item_price, cursor.page) if p is not None]
+    ceiling = min(shown_prices) if shown_prices else None
+
+    priced = [(item_price(item), i, item) for i, item in enumerate(cursor.items)]
+    refined = [
+        item
+        for price, _, item in sorted(t for t in priced if t[0] is not None)
+        if ceiling is None or price < ceiling
+    ]
+    if not refined:
+        return []
+
+    cursor.items = refined
+    cursor.page_start = cursor.shown = 0
+    return next_page(cursor)
+
+
+FOLLOW_UPS = {
+    "more": next_page,
+    "cheaper": cheaper,
+}
+
+
+def serve_follow_up(user_id: str, session_id: str, kind: str) -> Tuple[Cursor, List[Dict]] | None:
+    """
+    Serve a follow-up from the session's cursor without searching again.
+    Returns (cursor, page), or None when there is no live cursor.
+    """
+    cursor = cursors.get(user_id, session_id)
+    if cursor is None:
+        return None
+    return cursor, FOLLOW_UPS[kind](cursor)
@@ -0,0 +1,41 @@
+# utils/deadline.py
+
+import math
+import time
+from contextvars import ContextVar
+
+# Absolute monotonic deadline for the current request (None = unbounded).
+# Context variables are copied into tasks, so every stage spawned by the
+# request sees the same budget.
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def start(budget_seconds: float):
+    """
+    Set the deadline for the current request context.
+    """
+    _deadline.set(time.monotonic() + budget_seconds if budget_seconds > 0 else None)
+
+
+def remaining() -> float:
+    """
+    Seconds left before the deadline (inf when no deadline is set).
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return math.inf
+    return max(0.0, deadline - time.monotonic())
+
+
+def timeout(cap: float | None = None, floor: float = 0.0) -> float | None:
+    """
+    Timeout for one I/O stage: the stage's own cap, shortened to the time
+    left, but never below `floor`. None means unbounded.
+    """
+    left = remaining()
+    if cap is not None:
+        left = min(left, cap)
+    if math.isinf(left):
+        return None
+    return max(left, floor)
+
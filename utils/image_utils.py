@@ -1,8 +1,14 @@
 # utils/image_utils.py
 
+from urllib.parse import urlencode
+
+from utils.settings import get_settings
+
 CDN_BASE = "https://cdn.nashikcityguide.com/"
 PLACEHOLDER = CDN_BASE + "assets/images/default_placeholder.jpg"  # keep if you want a fallback later
 
+settings = get_settings()
+
 def build_image_url(thumbnail_image: str | None) -> str | None:
     """
     Return a full CDN URL for a thumbnail path coming from dataset.
@@ -12,3 +18,31 @@ def build_image_url(thumbnail_image: str | None) -> str | None:
         return None
     # ensure no leading slash duplication
     return CDN_BASE + thumbnail_image.lstrip("/")
+
+
+def pick_image_path(item: dict) -> str | None:
+    """
+    Pick the card image path for a search item:
+    thumbnail_image first, then the first gallery image.
+    """
+    if item.get("thumbnail_image"):
+        return item["thumbnail_image"]
+    if isinstance(item.get("gallery_images"), list) and item["gallery_images"]:
+        return item["gallery_images"][0]
+    return None
+
+
+def build_card_image_url(image_url: str | None) -> str | None:
+    """
+    Point a CDN image at its card-sized /img variant when the proxy is
+    configured (settings.image_proxy_base_url, the public base URL of this API);
+    otherwise return it unchanged.
+    """
+    if not image_url or not settings.image_proxy_base_url or not image_url.startswith(CDN_BASE):
+        return image_url
+    query = urlencode({
+        "src": image_url[len(CDN_BASE):],
+        "w": settings.card_image_width,
+        "fmt": settings.card_image_format,
+    })
+    return f"{settings.image_proxy_base_url}/img?{query}"
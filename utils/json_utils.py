@@ -0,0 +1,103 @@
+# utils/json_utils.py
+
+import json
+from typing import Any, List, TypedDict
+
+# Optional fast backends: msgspec (schema-driven) > orjson > stdlib json
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# ------------------------
+# Search payload schema
+# ------------------------
+# Only the fields our services actually read. Unknown keys are skipped by
+# msgspec while decoding, so large payloads never materialize them.
+class SearchItem(TypedDict, total=False):
+    table_id: Any
+    category_id: Any
+    vendor_name: Any
+    name: Any
+    category: Any
+    sub_category: Any
+    type: Any
+    description: Any
+    short_description: Any
+    star_rating: Any
+    rating: Any
+    address: Any
+    location: Any
+    area: Any
+    area_name: Any
+    zone_name: Any
+    phone: Any
+    email: Any
+    website: Any
+    pet_friendly: Any
+    parking_available: Any
+    air_conditioned: Any
+    food_available: Any
+    kitchen_available: Any
+    taxes_included: Any
+    price_from: Any
+    price_unit: Any
+    cancellation: Any
+    google_location: Any
+    amenities_gallery: Any
+    thumbnail_image: Any
+    gallery_images: Any
+
+
+class SearchData(TypedDict, total=False):
+    search_data: List[SearchItem]
+
+
+class SearchPayload(TypedDict, total=False):
+    data: SearchData
+
+
+_search_decoder = msgspec.json.Decoder(SearchPayload) if msgspec else None
+
+
+def loads(content: bytes | str) -> Any:
+    """
+    Decode arbitrary JSON using the fastest available backend.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    if msgspec is not None:
+        return msgspec.json.decode(content)
+    return json.loads(content)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode to compact UTF-8 JSON bytes using the fastest available backend.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if msgspec is not None:
+        return msgspec.json.encode(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_search_payload(content: bytes) -> Any:
+    """
+    Decode a search API response body.
+    With msgspec installed, only the SearchItem fields are decoded (as plain
+    dicts). Payloads that don't match the schema fall back to a full decode
+    so callers keep their existing shape checks.
+    """
+    if _search_decoder is not None:
+        try:
+            return _search_decoder.decode(content)
+        except msgspec.ValidationError:
+            pass
+    return loads(content)
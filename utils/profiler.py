@@ -0,0 +1,114 @@
+# utils/profiler.py
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from utils.settings import PROJECT_ROOT, get_settings
+
+settings = get_settings()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # Keep paths short: project-relative, else just the module file
+    try:
+        filename = str(Path(filename).relative_to(PROJECT_ROOT))
+    except ValueError:
+        filename = Path(filename).name
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class RequestProfiler:
+    """
+    Statistical profiler for one request.
+    A daemon thread samples the stacks of every other thread (event loop
+    and to_thread workers, e.g. the Groq call) every PROFILE_INTERVAL_MS and
+    writes them in folded format ("root;...;leaf count"), which
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, label: str, interval_ms: float | None = None):
+        self.label = label
+        self.interval = (interval_ms or settings.profile_interval_ms) / 1000.0
+        self.samples: Counter = Counter()
+        self.output_path: Path | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        # Named up front so the response headers can point at it
+        safe_label = "".join(c if c.isalnum() else "_" for c in self.label).strip("_")
+        self.output_path = settings.profile_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{id(self):x}.folded"
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        print(
+            f"[DEBUG] Profile: {sum(self.samples.values())} samples over "
+            f"{elapsed_ms:.0f} ms -> {self.output_path}"
+        )
+        return False
+
+
+class ProfilingMiddleware:
+    """
+    Profile the requests `trigger(scope)` picks ("admin" or "sampled");
+    every other request goes straight to the app. Only admin-triggered
+    responses carry X-Profile-Output.
+    Pure ASGI, so response bodies reach the compression middleware in one
+    piece.
+    """
+
+    def __init__(self, app, trigger):
+        self.app = app
+        self.trigger = trigger
+
+    async def __call__(self, scope, receive, send):
+        trigger = self.trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        with RequestProfiler(scope["path"]) as profiler:
+            if trigger != "admin":
+                await self.app(scope, receive, send)
+                return
+
+            output = profiler.output_path.name.encode()
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile-output", output)]}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
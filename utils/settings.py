@@ -0,0 +1,243 @@
+# utils/settings.py
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _str(name: str, default: str = "") -> str:
+    return os.getenv(name, default).strip()
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _path(name: str, default: Path) -> Path:
+    return Path(os.getenv(name, str(default)))
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    All runtime configuration, read from the environment (and .env) once.
+    """
+    # Auth / upstream
+    jwt_secret: str
+    nashik_api_token: str
+    groq_api_key: str
+    database_url: str
+
+    # LLM
+    llm_timeout_seconds: float
+
+    # /ask: end-to-end budget per call; the LLM is skipped when less than
+    # llm_min_budget_seconds remain after search
+    ask_batch_max_size: int
+    ask_batch_llm_concurrency: int
+    ask_deadline_seconds: float
+    llm_min_budget_seconds: float
+
+    # Chat memory: "postgres", "sqlite", or "auto" (postgres when
+    # DATABASE_URL is set). SQLite writes queued behind an in-flight commit
+    # (or within the optional group commit window) share one transaction.
+    memory_backend: str
+    memory_sqlite_path: Path
+    memory_sqlite_readers: int
+    memory_group_commit_ms: float
+    memory_group_commit_max: int
+
+    # Session cursors for "show more" / "cheaper" follow-ups
+    session_cursor_ttl_seconds: float
+    session_cursor_max_sessions: int
+    session_cursor_max_items: int
+
+    # Popular query precomputation
+    popular_top_k: int
+    popular_sketch_size: int
+    popular_min_count: float
+    popular_refresh_seconds: float
+    popular_max_age_seconds: float
+    popular_decay: float
+    popular_precompute_answers: bool
+
+    # Multi-worker
+    worker_count: int
+    cluster_state_dir: Path
+    cluster_sync_seconds: float
+    port: int
+
+    # DB pool. The connection budget is shared by all workers; each gets a
+    # share. Set the statement cache to 0 behind pgbouncer in transaction
+    # mode. The deadline floor is the minimum time a DB call gets even when
+    # the request deadline is (nearly) spent.
+    db_connection_budget: int
+    db_pool_max_size: int
+    db_pool_min_size: int
+    db_statement_cache_size: int
+    db_command_timeout: float | None
+    db_max_inactive_connection_lifetime: float
+    db_acquire_timeout: float | None
+    db_deadline_floor: float
+
+    # Catalogue + local indexes
+    catalogue_query: str
+    catalogue_page_size: int
+    catalogue_max_pages: int
+    catalogue_refresh_seconds: int
+    catalogue_snapshot_path: Path
+    geo_cell_deg: float
+    geo_max_radius_km: float
+    facet_luxury_min_rating: float
+    facet_budget_max_price: float
+
+    # Admission control
+    rate_limit_per_minute: float
+    rate_limit_burst: float
+    rate_limit_max_users: int
+    admission_max_in_flight: int
+    admission_reserved_priority_slots: int
+    admission_max_queue: int
+    admission_queue_timeout_seconds: float
+
+    # Responses: card description length and compression (a negative
+    # minimum size disables compression)
+    card_description_max_chars: int
+    compression_min_bytes: int
+    compression_gzip_level: int
+    compression_brotli_quality: int
+
+    # Images
+    image_cache_dir: Path
+    image_cache_max_bytes: int
+    image_workers: int
+    image_fetch_timeout: float
+    image_max_source_bytes: int
+    image_max_age_seconds: int
+    image_proxy_base_url: str
+    card_image_width: int
+    card_image_format: str
+
+    # Profiling
+    profile_admin_token: str
+    profile_sample_rate: float
+    profile_path_prefix: str
+    profile_dir: Path
+    profile_interval_ms: float
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        data_dir = PROJECT_ROOT / "data"
+        worker_count = max(1, _int("WEB_CONCURRENCY", 1))
+        db_connection_budget = _int("DB_CONNECTION_BUDGET", 20)
+        db_pool_max_size = _int("DB_POOL_MAX_SIZE", max(1, db_connection_budget // worker_count))
+        popular_refresh_seconds = _float("POPULAR_REFRESH_SECONDS", 300)
+
+        return cls(
+            jwt_secret=_str("JWT_SECRET"),
+            nashik_api_token=_str("NASHIK_API_TOKEN"),
+            groq_api_key=_str("GROQ_API_KEY"),
+            database_url=_str("DATABASE_URL"),
+
+            llm_timeout_seconds=_float("LLM_TIMEOUT_SECONDS", 60),
+
+            ask_batch_max_size=_int("ASK_BATCH_MAX_SIZE", 10),
+            ask_batch_llm_concurrency=_int("ASK_BATCH_LLM_CONCURRENCY", 4),
+            ask_deadline_seconds=_float("ASK_DEADLINE_SECONDS", 20),
+            llm_min_budget_seconds=_float("LLM_MIN_BUDGET_SECONDS", 3),
+
+            memory_backend=_str("MEMORY_BACKEND", "auto").lower(),
+            memory_sqlite_path=_path("MEMORY_SQLITE_PATH", data_dir / "memory.db"),
+            memory_sqlite_readers=_int("MEMORY_SQLITE_READERS", 4),
+            memory_group_commit_ms=_float("MEMORY_GROUP_COMMIT_MS", 0),
+            memory_group_commit_max=_int("MEMORY_GROUP_COMMIT_MAX", 256),
+
+            session_cursor_ttl_seconds=_float("SESSION_CURSOR_TTL_SECONDS", 900),
+            session_cursor_max_sessions=_int("SESSION_CURSOR_MAX_SESSIONS", 5000),
+            session_cursor_max_items=_int("SESSION_CURSOR_MAX_ITEMS", 30),
+
+            popular_top_k=_int("POPULAR_TOP_K", 10),
+            popular_sketch_size=_int("POPULAR_SKETCH_SIZE", 256),
+            popular_min_count=_float("POPULAR_MIN_COUNT", 3),
+            popular_refresh_seconds=popular_refresh_seconds,
+            popular_max_age_seconds=_float("POPULAR_MAX_AGE_SECONDS", 2 * popular_refresh_seconds),
+            popular_decay=_float("POPULAR_DECAY", 0.5),
+            # Each worker warms its own entries: with several workers, answer
+            # precompute would multiply LLM calls, so it is opt-in there
+            popular_precompute_answers=_bool("POPULAR_PRECOMPUTE_ANSWERS", worker_count == 1),
+
+            worker_count=worker_count,
+            cluster_state_dir=_path("CLUSTER_STATE_DIR", data_dir),
+            cluster_sync_seconds=_float("CLUSTER_SYNC_SECONDS", 2),
+            port=_int("PORT", 8000),
+
+            db_connection_budget=db_connection_budget,
+            db_pool_max_size=db_pool_max_size,
+            db_pool_min_size=min(_int("DB_POOL_MIN_SIZE", 1), db_pool_max_size),
+            db_statement_cache_size=_int("DB_STATEMENT_CACHE_SIZE", 100),
+            db_command_timeout=_float("DB_COMMAND_TIMEOUT", 10) or None,
+            db_max_inactive_connection_lifetime=_float("DB_MAX_INACTIVE_CONNECTION_LIFETIME", 300),
+            db_acquire_timeout=_float("DB_ACQUIRE_TIMEOUT", 5) or None,
+            db_deadline_floor=_float("DB_DEADLINE_FLOOR", 0.5),
+
+            catalogue_query=_str("CATALOGUE_QUERY"),
+            catalogue_page_size=_int("CATALOGUE_PAGE_SIZE", 200),
+            catalogue_max_pages=_int("CATALOGUE_MAX_PAGES", 100),
+            catalogue_refresh_seconds=_int("CATALOGUE_REFRESH_SECONDS", 3600),
+            catalogue_snapshot_path=_path("CATALOGUE_SNAPSHOT_PATH", data_dir / "catalogue.snapshot"),
+            geo_cell_deg=_float("GEO_CELL_DEG", 0.01),
+            geo_max_radius_km=_float("GEO_MAX_RADIUS_KM", 10),
+            facet_luxury_min_rating=_float("FACET_LUXURY_MIN_RATING", 4),
+            facet_budget_max_price=_float("FACET_BUDGET_MAX_PRICE", 2000),
+
+            rate_limit_per_minute=_float("RATE_LIMIT_PER_MINUTE", 30),
+            rate_limit_burst=_float("RATE_LIMIT_BURST", 10),
+            rate_limit_max_users=_int("RATE_LIMIT_MAX_USERS", 10000),
+            admission_max_in_flight=_int("ADMISSION_MAX_IN_FLIGHT", 32),
+            admission_reserved_priority_slots=_int("ADMISSION_RESERVED_PRIORITY_SLOTS", 4),
+            admission_max_queue=_int("ADMISSION_MAX_QUEUE", 64),
+            admission_queue_timeout_seconds=_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 2),
+
+            card_description_max_chars=_int("CARD_DESCRIPTION_MAX_CHARS", 160),
+            compression_min_bytes=_int("COMPRESSION_MIN_BYTES", 1024),
+            compression_gzip_level=_int("COMPRESSION_GZIP_LEVEL", 6),
+            compression_brotli_quality=_int("COMPRESSION_BROTLI_QUALITY", 5),
+
+            image_cache_dir=_path("IMAGE_CACHE_DIR", data_dir / "img"),
+            image_cache_max_bytes=_int("IMAGE_CACHE_MAX_MB", 512) * 1024 * 1024,
+            image_workers=_int("IMAGE_WORKERS", 2),
+            image_fetch_timeout=_float("IMAGE_FETCH_TIMEOUT", 10),
+            image_max_source_bytes=_int("IMAGE_MAX_SOURCE_MB", 15) * 1024 * 1024,
+            image_max_age_seconds=_int("IMAGE_MAX_AGE_SECONDS", 86400),
+            image_proxy_base_url=_str("IMAGE_PROXY_BASE_URL").rstrip("/"),
+            card_image_width=_int("CARD_IMAGE_WIDTH", 320),
+            card_image_format=_str("CARD_IMAGE_FORMAT", "webp"),
+
+            profile_admin_token=_str("PROFILE_ADMIN_TOKEN"),
+            profile_sample_rate=_float("PROFILE_SAMPLE_RATE", 0),
+            profile_path_prefix=_str("PROFILE_PATH_PREFIX", "/ask"),
+            profile_dir=_path("PROFILE_DIR", data_dir / "profiles"),
+            profile_interval_ms=_float("PROFILE_INTERVAL_MS", 5),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load .env (once) and build the settings object.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(PROJECT_ROOT / ".env")
+    return Settings.from_env()